@@ -0,0 +1,64 @@
+# Generated by Django 5.2.5 on 2026-10-15 21:15
+
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+# Only this many days of history are read; a streak older than that has
+# lapsed anyway, and the receiver restarts it at 1 on the next goal day.
+STREAK_MAX_DAYS = 365
+
+
+def backfill_streaks(apps, schema_editor):
+    """Compute the stored streak for users who already have completed tests."""
+    UserProfile = apps.get_model('accounts', 'UserProfile')
+    TestSubmission = apps.get_model('exams', 'TestSubmission')
+
+    since = timezone.now() - timedelta(days=STREAK_MAX_DAYS + 1)
+    good_days = defaultdict(set)
+    rows = TestSubmission.objects.filter(
+        status='completed', finished_at__gte=since
+    ).annotate(day=TruncDate('finished_at')).values('user_id', 'day').annotate(
+        c=Count('id')
+    ).filter(c__gte=5)
+    for row in rows:
+        good_days[row['user_id']].add(row['day'])
+
+    for user_id, days in good_days.items():
+        last_day = max(days)
+        streak = 0
+        check_date = last_day
+        for _ in range(STREAK_MAX_DAYS):
+            if check_date not in days:
+                break
+            streak += 1
+            check_date -= timedelta(days=1)
+        UserProfile.objects.filter(user_id=user_id).update(
+            current_streak=streak, last_streak_date=last_day
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('exams', '0002_testsubmission_exams_tests_user_id_580265_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='current_streak',
+            field=models.PositiveIntegerField(default=0, help_text='Consecutive days, ending on last_streak_date, that met the daily test goal.'),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='last_streak_date',
+            field=models.DateField(blank=True, help_text='Most recent day that met the daily test goal.', null=True),
+        ),
+        migrations.RunPython(backfill_streaks, migrations.RunPython.noop),
+    ]
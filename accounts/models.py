@@ -1,11 +1,17 @@
 #accounts/models.py
 from django.db import models
 from django.conf import settings 
+from django.db.models import Max
 from django.utils import timezone
+from django.utils.functional import cached_property
 from subscriptions.models import UserSubscription # <-- IMPORT THIS
+from .utils import invalidate_profile_caches
 
 # Create your models here.
 
+# Completed tests needed in a day for that day to count towards the streak
+STREAK_DAILY_GOAL = 5
+
 # Create your models here.
 class UserProfile(models.Model):
     """
@@ -18,25 +24,55 @@ class UserProfile(models.Model):
         related_name="profile" 
     )
     reward_points = models.PositiveIntegerField(default=0, help_text="Total reward points accumulated by the user.")
+    current_streak = models.PositiveIntegerField(default=0, help_text="Consecutive days, ending on last_streak_date, that met the daily test goal.")
+    last_streak_date = models.DateField(null=True, blank=True, help_text="Most recent day that met the daily test goal.")
 
     def __str__(self):
         return f"{self.user.username}'s Profile"
+
+    @classmethod
+    def award_points(cls, user_ids, points):
+        """
+        Add reward points to several users in a single UPDATE.
+        update() skips save() and the post_save signal on purpose, so the
+        users' cached profiles are dropped here.
+        """
+        cls.objects.filter(user_id__in=user_ids).update(
+            reward_points=models.F('reward_points') + points
+        )
+        invalidate_profile_caches(user_ids)
+
+    @property
+    def active_streak(self):
+        """The stored streak, or 0 once a whole day has been missed since it last grew."""
+        if self.last_streak_date is None:
+            return 0
+        # The profile view sets _today so the whole payload uses one moment
+        today = getattr(self, '_today', None) or timezone.localdate()
+        if (today - self.last_streak_date).days > 1:
+            return 0
+        return self.current_streak
     
     # --- ADD THESE TWO PROPERTIES ---
 
-    @property
-    def has_active_subscription(self):
-        """Checks if the user has ANY active subscription."""
+    @cached_property
+    def _latest_sub_end(self):
+        """End date of the latest active subscription, or None if there is none."""
+        # Use the active subscriptions prefetched by the profile view when present
+        subs = getattr(self.user, '_active_subs', None)
+        if subs is not None:
+            return max((sub.end_date for sub in subs), default=None)
         return UserSubscription.objects.filter(
             user=self.user,
             end_date__gt=timezone.now()
-        ).exists()
+        ).aggregate(m=Max('end_date'))['m']
+
+    @property
+    def has_active_subscription(self):
+        """Checks if the user has ANY active subscription."""
+        return self._latest_sub_end is not None
     
     @property
     def active_subscription_end_date(self):
         """Gets the end date of the *latest* active subscription."""
-        latest_sub = UserSubscription.objects.filter(
-            user=self.user,
-            end_date__gt=timezone.now()
-        ).order_by('-end_date').first()
-        return latest_sub.end_date if latest_sub else None
+        return self._latest_sub_end
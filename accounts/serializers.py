@@ -3,9 +3,6 @@ from rest_framework import serializers
 from django.contrib.auth.models import User
 from django.contrib.auth.password_validation import validate_password
 from exams.models import TestSubmission
-from django.db.models import Avg
-from django.utils import timezone
-from datetime import timedelta
 from .models import UserProfile
 
 class SignupSerializer(serializers.ModelSerializer):
@@ -41,11 +38,9 @@ class SignupSerializer(serializers.ModelSerializer):
             password=validated_data['password']
         )
 
-        # Optionally, update any UserProfile fields here (reward_points, etc.)
-        # The profile already exists because the post_save signal creates it
-        profile = user.profile
-        profile.reward_points = 0  # or any default value you want
-        profile.save()
+        # The profile already exists because the post_save signal creates it,
+        # with reward_points at its default of 0. If a non-default value is
+        # ever needed here, save it with update_fields=['reward_points'].
 
         return user
 
@@ -60,57 +55,12 @@ class UserProfileSerializer(serializers.ModelSerializer):
     has_active_subscription = serializers.BooleanField(source='profile.has_active_subscription', read_only=True)
     subscription_end_date = serializers.DateTimeField(source='profile.active_subscription_end_date', read_only=True)
 
-    completed_tests_today = serializers.SerializerMethodField()
-    average_score_today = serializers.SerializerMethodField()
-    current_streak = serializers.SerializerMethodField()
+    # Annotated onto the user queryset by the profile view
+    completed_tests_today = serializers.IntegerField(source='_tests_today', read_only=True)
+    average_score_today = serializers.FloatField(source='_avg_today', read_only=True)
+    current_streak = serializers.IntegerField(source='profile.active_streak', read_only=True)
 
     class Meta:
         model = User
         fields = ["id", "username", "email", "completed_tests_today", "average_score_today", "current_streak", "reward_points"
                   ,"has_active_subscription", "subscription_end_date" ] # <-- ADD
-
-    def get_completed_tests_today(self, obj):
-        today = timezone.now().date()
-        return obj.submissions.filter(status="completed", finished_at__date=today).count()
-
-    def get_average_score_today(self, obj):
-        today = timezone.now().date()
-        return (
-            obj.submissions.filter(status="completed", finished_at__date=today)
-            .aggregate(avg=Avg("score"))["avg"] or 0
-        )
-
-
-     # ... inside your UserSerializer class
-
-    def get_current_streak(self, obj):
-        today = timezone.now().date()
-        
-        # Check if the user has completed at least 5 tests today
-        tests_today = obj.submissions.filter(status="completed", finished_at__date=today).count()
-
-        # Determine the starting date for the streak calculation
-        if tests_today >= 5:
-            # If the goal is met today, the streak includes today.
-            # Start checking from today and go backwards.
-            check_date = today
-        else:
-            # If the goal isn't met today, the streak is based on previous days.
-            # Start checking from yesterday and go backwards.
-            check_date = today - timedelta(days=1)
-
-        streak = 0
-        while True:
-            # Count completed tests for the check_date
-            tests_on_day = obj.submissions.filter(status="completed", finished_at__date=check_date).count()
-
-            if tests_on_day >= 5:
-                streak += 1
-                # Move to the previous day
-                check_date -= timedelta(days=1)
-            else:
-                # The streak is broken, so stop counting
-                break
-                
-        return streak
-
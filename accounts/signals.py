@@ -3,16 +3,30 @@
 from django.db.models.signals import post_save
 from django.contrib.auth.models import User
 from django.dispatch import receiver
+from exams.models import TestSubmission
+from subscriptions.models import UserSubscription
 from .models import UserProfile
+from .utils import invalidate_profile_cache
 
 @receiver(post_save, sender=User)
 def create_or_update_user_profile(sender, instance, created, **kwargs):
     """
-    Creates a UserProfile when a new User is created and saves it on subsequent updates.
+    Creates a UserProfile when a new User is created.
+
+    Later User saves (logins, password changes, admin edits) leave the
+    profile untouched; code that changes profile fields saves it explicitly.
     """
     if created:
         # Safely create the profile only if it doesn't already exist.
         UserProfile.objects.get_or_create(user=instance)
-    
-    # Save the profile every time the user object is saved.
-    instance.profile.save()
\ No newline at end of file
+
+
+@receiver(post_save, sender=TestSubmission)
+@receiver(post_save, sender=UserSubscription)
+@receiver(post_save, sender=UserProfile)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    """
+    Drops the cached /profile/ payload when anything it shows changes:
+    today's submissions, subscription status or reward points.
+    """
+    invalidate_profile_cache(instance.user_id)
@@ -1,3 +1,44 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from exams.models import Exam, Question, SubExam, TestCard, TestSubmission
+
+
+class ProfileCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        exam = Exam.objects.create(id='exam1', name='Exam')
+        sub_exam = SubExam.objects.create(id='sub1', exam=exam, name='Sub Exam')
+        self.test_card = TestCard.objects.create(
+            id='challenge1', sub_exam=sub_exam, name='Challenge',
+            test_type=TestCard.TestType.CHALLENGE, reward_points=5
+        )
+        self.question = Question.objects.create(
+            test_card=self.test_card, question_text='Question',
+            option_a='A', option_b='B', option_c='C', option_d='D',
+            correct_option='A'
+        )
+        self.user = User.objects.create_user('student', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_profile_shows_submission_made_after_it_was_cached(self):
+        # Cache the payload from before the submission
+        response = self.client.get('/accounts/profile/')
+        self.assertEqual(response.data['reward_points'], 0)
+        self.assertEqual(response.data['completed_tests_today'], 0)
+
+        submission = TestSubmission.objects.create(user=self.user, test_card=self.test_card)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f'/exams/api/submissions/{submission.pk}/submit_test/',
+                {'answers': [{'question_id': self.question.id, 'selected_option': 'A'}]},
+                format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get('/accounts/profile/')
+        self.assertEqual(response.data['reward_points'], 5)
+        self.assertEqual(response.data['completed_tests_today'], 1)
@@ -0,0 +1,27 @@
+# accounts/utils.py
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+PROFILE_CACHE_TIMEOUT = 300  # seconds
+
+
+def profile_cache_key(user_id):
+    """Cache key for a user's /profile/ payload; it rolls over every day."""
+    return f"prof:{user_id}:{timezone.now().date()}"
+
+
+def invalidate_profile_cache(user_id):
+    """
+    Drop the cached /profile/ payload after the user's stats change.
+    The delete waits for the surrounding transaction to commit; done earlier,
+    a /profile/ request in between would cache the old rows again.
+    """
+    transaction.on_commit(lambda: cache.delete(profile_cache_key(user_id)))
+
+
+def invalidate_profile_caches(user_ids):
+    """invalidate_profile_cache() for many users in one cache round-trip."""
+    keys = [profile_cache_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
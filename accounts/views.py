@@ -1,11 +1,19 @@
 # accounts/views.py
 from django.shortcuts import render
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Avg, Count, Prefetch, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from exams.models import TestSubmission
+from subscriptions.models import UserSubscription
 
 # Create your views here.
 from rest_framework.response import Response
 from rest_framework import status, generics
 from .serializers import SignupSerializer
 from .serializers import UserProfileSerializer
+from .utils import PROFILE_CACHE_TIMEOUT, profile_cache_key
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated # <-- This is key!
 from rest_framework.decorators import api_view, permission_classes
@@ -16,12 +24,12 @@ from rest_framework.decorators import api_view, permission_classes
 class SignupView(generics.CreateAPIView):
     serializer_class = SignupSerializer
 
-    def post(self, request, *args, **kwargs):
-        serializer = self.get_serializer(data=request.data)
-        if serializer.is_valid():
-            serializer.save()
-            return Response({"message": "User created successfully!"}, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    def create(self, request, *args, **kwargs):
+        # Let CreateAPIView validate and run perform_create, but keep the
+        # short confirmation body the frontend expects.
+        response = super().create(request, *args, **kwargs)
+        response.data = {"message": "User created successfully!"}
+        return response
     
 
 
@@ -30,8 +38,36 @@ class SignupView(generics.CreateAPIView):
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_user_profile(request):
-    serializer = UserProfileSerializer(request.user)
-    return Response(serializer.data)
+    key = profile_cache_key(request.user.pk)
+    data = cache.get(key)
+    if data is not None:
+        return Response(data)
+
+    # One time reference for every date-dependent part of the payload
+    now = timezone.now()
+    today = timezone.localdate(now)
+    completed_today = Q(
+        submissions__status=TestSubmission.Status.COMPLETED,
+        submissions__finished_at__date=today,
+    )
+    user = User.objects.select_related('profile').only(
+        'id', 'username', 'email',
+        'profile__reward_points', 'profile__current_streak', 'profile__last_streak_date',
+    ).annotate(
+        _tests_today=Count('submissions', filter=completed_today),
+        _avg_today=Coalesce(Avg('submissions__score', filter=completed_today), 0.0),
+    ).prefetch_related(
+        Prefetch(
+            'user_subscriptions',
+            queryset=UserSubscription.objects.filter(end_date__gt=now),
+            to_attr='_active_subs',
+        )
+    ).get(pk=request.user.pk)
+    # active_streak compares against the same day as the counts above
+    user.profile._today = today
+    data = UserProfileSerializer(user).data
+    cache.set(key, data, timeout=PROFILE_CACHE_TIMEOUT)
+    return Response(data)
 
 
 
@@ -1,7 +1,9 @@
 # your_app/admin.py
 
 from django.contrib import admin
+from django.db.models import Count
 from django.utils.html import format_html
+from accounts.utils import invalidate_profile_caches
 from .models import (
     UserProfile, Exam, SubExam, StudyNote, MindMap, Flashcard,
     TestCard, Question, UnlockedTestCard, TestSubmission,
@@ -14,6 +16,10 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_display = ['user', 'reward_points']
     search_fields = ['user__username', 'user__email']
     readonly_fields = ['user']
+    
+    def get_queryset(self, request):
+        # UserProfile.__str__ and the user column both read the username
+        return super().get_queryset(request).select_related('user')
 
 
 @admin.register(Exam)
@@ -21,8 +27,11 @@ class ExamAdmin(admin.ModelAdmin):
     list_display = ['id', 'name', 'sub_exam_count']
     search_fields = ['name']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(_sub_exam_count=Count('sub_exams'))
+    
     def sub_exam_count(self, obj):
-        return obj.sub_exams.count()
+        return obj._sub_exam_count
     sub_exam_count.short_description = 'Sub Exams'
 
 
@@ -32,8 +41,11 @@ class SubExamAdmin(admin.ModelAdmin):
     list_filter = ['exam']
     search_fields = ['name', 'exam__name']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('exam').annotate(_test_card_count=Count('test_cards'))
+    
     def test_card_count(self, obj):
-        return obj.test_cards.count()
+        return obj._test_card_count
     test_card_count.short_description = 'Test Cards'
 
 
@@ -82,8 +94,11 @@ class TestCardAdmin(admin.ModelAdmin):
     list_editable = ['is_active', 'order']
     inlines = [QuestionInline]
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('sub_exam__exam')
+    
     def question_count(self, obj):
-        return obj.questions.count()
+        return obj.num_questions
     question_count.short_description = 'Questions'
 
 
@@ -93,6 +108,9 @@ class QuestionAdmin(admin.ModelAdmin):
     list_filter = ['test_card', 'difficulty', 'section']
     search_fields = ['question_text', 'topic']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('test_card__sub_exam')
+    
     def question_preview(self, obj):
         return obj.question_text[:60] + '...' if len(obj.question_text) > 60 else obj.question_text
     question_preview.short_description = 'Question'
@@ -104,6 +122,9 @@ class UnlockedTestCardAdmin(admin.ModelAdmin):
     list_filter = ['test_card__test_type', 'unlocked_at']
     search_fields = ['user__username', 'test_card__name']
     date_hierarchy = 'unlocked_at'
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'test_card__sub_exam')
 
 
 class AnswerInline(admin.TabularInline):
@@ -111,6 +132,10 @@ class AnswerInline(admin.TabularInline):
     extra = 0
     readonly_fields = ['question', 'selected_option', 'is_correct', 'is_marked', 'mark_reason']
     can_delete = False
+    
+    def get_queryset(self, request):
+        # Question.__str__ reads its test card name, so join both
+        return super().get_queryset(request).select_related('question__test_card')
 
 
 @admin.register(TestSubmission)
@@ -122,6 +147,9 @@ class TestSubmissionAdmin(admin.ModelAdmin):
     date_hierarchy = 'finished_at'
     inlines = [AnswerInline]
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'test_card__sub_exam')
+    
     def has_add_permission(self, request):
         return False
 
@@ -133,6 +161,9 @@ class AnswerAdmin(admin.ModelAdmin):
     search_fields = ['submission__user__username', 'question__question_text']
     readonly_fields = ['submission', 'question', 'selected_option', 'is_correct']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('submission__user', 'question')
+    
     def submission_user(self, obj):
         return obj.submission.user.username
     submission_user.short_description = 'User'
@@ -150,6 +181,9 @@ class RevisionLogAdmin(admin.ModelAdmin):
     date_hierarchy = 'added_at'
     readonly_fields = ['user', 'question', 'reason', 'source_test_card', 'source_submission_attempt', 'added_at']
     
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('user', 'question', 'source_test_card__sub_exam')
+    
     def question_preview(self, obj):
         return obj.question.question_text[:50] + '...'
     question_preview.short_description = 'Question'
@@ -161,6 +195,9 @@ class RevisionLogAdmin(admin.ModelAdmin):
 # Custom admin actions
 @admin.action(description='Reset reward points to 0')
 def reset_reward_points(modeladmin, request, queryset):
+    user_ids = list(queryset.values_list('user_id', flat=True))
     queryset.update(reward_points=0)
+    # update() skips the signal that clears the cached profiles
+    invalidate_profile_caches(user_ids)
 
 UserProfileAdmin.actions = [reset_reward_points]
\ No newline at end of file
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-15 21:13
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='testsubmission',
+            index=models.Index(fields=['user', 'status', 'finished_at'], name='exams_tests_user_id_580265_idx'),
+        ),
+    ]
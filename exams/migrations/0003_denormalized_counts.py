@@ -0,0 +1,62 @@
+# Generated by Django 5.2.5 on 2026-10-15 21:20
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counts(apps, schema_editor):
+    """Fill the new count columns from existing questions and answers."""
+    TestCard = apps.get_model('exams', 'TestCard')
+    Question = apps.get_model('exams', 'Question')
+    TestSubmission = apps.get_model('exams', 'TestSubmission')
+    Answer = apps.get_model('exams', 'Answer')
+
+    question_counts = Question.objects.filter(
+        test_card=OuterRef('pk')
+    ).order_by().values('test_card').annotate(c=Count('id')).values('c')
+    TestCard.objects.update(num_questions=Coalesce(Subquery(question_counts), 0))
+
+    answers = Answer.objects.filter(submission=OuterRef('pk')).order_by().values('submission')
+    TestSubmission.objects.filter(status='completed').update(
+        total_questions=Subquery(
+            TestCard.objects.filter(pk=OuterRef('test_card_id')).values('num_questions')
+        ),
+        correct_count=Coalesce(Subquery(
+            answers.filter(is_correct=True).annotate(c=Count('id')).values('c')
+        ), 0),
+        attempted_count=Coalesce(Subquery(
+            answers.filter(selected_option__isnull=False).annotate(c=Count('id')).values('c')
+        ), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0002_testsubmission_exams_tests_user_id_580265_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testcard',
+            name='num_questions',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of questions, kept in sync by signals on Question.'),
+        ),
+        migrations.AddField(
+            model_name='testsubmission',
+            name='attempted_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='testsubmission',
+            name='correct_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='testsubmission',
+            name='total_questions',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-15 21:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0003_denormalized_counts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='testsubmission',
+            name='exams_tests_user_id_580265_idx',
+        ),
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['submission', 'is_correct'], name='exams_answe_submiss_29e43a_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='testsubmission',
+            index=models.Index(fields=['user', 'status', '-finished_at'], name='sub_user_status_fin_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-15 21:28
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0004_remove_testsubmission_exams_tests_user_id_580265_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='revisionlog',
+            unique_together={('user', 'question', 'reason', 'source_test_card', 'source_submission_attempt')},
+        ),
+    ]
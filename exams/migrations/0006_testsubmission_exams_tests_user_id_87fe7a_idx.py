@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-15 21:29
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0005_alter_revisionlog_unique_together'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='testsubmission',
+            index=models.Index(fields=['user', 'test_card', 'attempt_number'], name='exams_tests_user_id_87fe7a_idx'),
+        ),
+    ]
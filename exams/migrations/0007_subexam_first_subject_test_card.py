@@ -0,0 +1,33 @@
+# Generated by Django 5.2.5 on 2026-10-15 21:32
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_first_subject_test(apps, schema_editor):
+    """Store each sub-exam's lowest-ordered subject-wise test."""
+    SubExam = apps.get_model('exams', 'SubExam')
+    TestCard = apps.get_model('exams', 'TestCard')
+
+    SubExam.objects.update(first_subject_test_card=Subquery(
+        TestCard.objects.filter(
+            sub_exam=OuterRef('pk'), test_type='SUBJECT'
+        ).order_by('order', 'pk').values('pk')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0006_testsubmission_exams_tests_user_id_87fe7a_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subexam',
+            name='first_subject_test_card',
+            field=models.ForeignKey(blank=True, editable=False, help_text='Lowest-ordered subject-wise test, kept in sync by signals on TestCard.', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='exams.testcard'),
+        ),
+        migrations.RunPython(backfill_first_subject_test, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-15 21:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exams', '0007_subexam_first_subject_test_card'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='revisionlog',
+            index=models.Index(fields=['question', 'user'], name='exams_revis_questio_ef0859_idx'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 # your_app/models.py
 
-from django.db import models
+from django.db import connection, models
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.utils import timezone
 from accounts.models import UserProfile
@@ -24,6 +25,25 @@ class SubExam(models.Model):
     id = models.CharField(max_length=50, primary_key=True)
     exam = models.ForeignKey(Exam, related_name='sub_exams', on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
+    first_subject_test_card = models.ForeignKey(
+        'TestCard', related_name='+', null=True, blank=True, editable=False, on_delete=models.SET_NULL,
+        help_text="Lowest-ordered subject-wise test, kept in sync by signals on TestCard."
+    )
+
+    @classmethod
+    def refresh_first_subject_test(cls, *sub_exam_ids):
+        """
+        Recompute the stored first subject-wise test for the given sub-exams.
+        Call this after bulk_create/update on TestCard, which skip the signals.
+        """
+        cls.objects.filter(pk__in=sub_exam_ids).update(
+            first_subject_test_card=models.Subquery(
+                TestCard.objects.filter(
+                    sub_exam=models.OuterRef('pk'),
+                    test_type=TestCard.TestType.SUBJECT_WISE
+                ).order_by('order', 'pk').values('pk')[:1]
+            )
+        )
 
     def __str__(self):
         return f"{self.exam.name} - {self.name}"
@@ -87,10 +107,28 @@ class TestCard(models.Model):
     price_points = models.PositiveIntegerField(default=0, help_text="Reward points required to unlock this test.")
     reward_points = models.PositiveIntegerField(default=0, help_text="Reward points earned for completing this test (for challenges and quizzes).")
     is_active = models.BooleanField(default=True, help_text="Whether the test is available for users.")
+    num_questions = models.PositiveIntegerField(default=0, editable=False, help_text="Number of questions, kept in sync by signals on Question.")
 
     class Meta:
         ordering = ['order']
 
+    @classmethod
+    def refresh_num_questions(cls, *test_card_ids):
+        """
+        Recount the stored number of questions for the given test cards.
+        Call this after bulk_create/update on Question, which skip the signals.
+        """
+        cls.objects.filter(pk__in=test_card_ids).update(
+            num_questions=Coalesce(
+                models.Subquery(
+                    Question.objects.filter(
+                        test_card=models.OuterRef('pk')
+                    ).values('test_card').annotate(c=models.Count('id')).values('c')
+                ),
+                0
+            )
+        )
+
     def __str__(self):
         return f"[{self.get_test_type_display()}] {self.sub_exam.name} → {self.name}"
 
@@ -123,6 +161,30 @@ class Question(models.Model):
     positive_marks = models.FloatField(default=1.0)
     negative_marks = models.FloatField(default=0.25) # Standard negative marking
 
+    # Everything that is carried over when a question is copied into another test
+    COPY_FIELDS = (
+        'question_text', 'option_a', 'option_b', 'option_c', 'option_d',
+        'correct_option', 'section', 'topic', 'difficulty',
+        'positive_marks', 'negative_marks',
+    )
+
+    @classmethod
+    def bulk_copy(cls, rows, test_card):
+        """
+        Copy questions into another test card in a single INSERT.
+        `rows` are dicts from .values(*Question.COPY_FIELDS), so the sources
+        are never hydrated into model instances.
+        bulk_create skips the signals, so the card's stored count is bumped here.
+        """
+        copies = cls.objects.bulk_create(
+            [cls(test_card=test_card, **row) for row in rows],
+            batch_size=100
+        )
+        TestCard.objects.filter(pk=test_card.pk).update(
+            num_questions=models.F('num_questions') + len(copies)
+        )
+        return copies
+
     def __str__(self):
         return f"{self.test_card.name}: {self.question_text[:50]}"
 
@@ -140,10 +202,31 @@ class UnlockedTestCard(models.Model):
     class Meta:
         unique_together = ('user', 'test_card') # User can unlock a test only once
 
+    @classmethod
+    def bulk_unlock(cls, user, test_cards):
+        """
+        Unlock several tests for a user in a single INSERT.
+        Tests the user has already unlocked are skipped by the unique constraint,
+        so prefer this over calling get_or_create() per test.
+        """
+        return cls.objects.bulk_create(
+            [cls(user=user, test_card=test_card) for test_card in test_cards],
+            ignore_conflicts=True
+        )
+
     def __str__(self):
         return f"{self.user.username} unlocked {self.test_card.name}"
 
 
+class TestSubmissionManager(models.Manager):
+    def completed_for(self, user):
+        """A user's completed submissions, the starting point of every analytics query."""
+        return self.filter(
+            user=user,
+            status=TestSubmission.Status.COMPLETED
+        ).select_related('test_card__sub_exam')
+
+
 class TestSubmission(models.Model):
     """Stores an overall record of a single attempt at a test by a user."""
     class Status(models.TextChoices):
@@ -160,6 +243,21 @@ class TestSubmission(models.Model):
     started_at = models.DateTimeField(auto_now_add=True)
     finished_at = models.DateTimeField(blank=True, null=True)
 
+    # --- Answer counts, written once when the test is submitted ---
+    total_questions = models.PositiveIntegerField(default=0)
+    correct_count = models.PositiveIntegerField(default=0)
+    attempted_count = models.PositiveIntegerField(default=0)
+
+    objects = TestSubmissionManager()
+
+    class Meta:
+        indexes = [
+            # Covers the per-user daily stats, streak and "latest first" queries
+            models.Index(fields=['user', 'status', '-finished_at'], name='sub_user_status_fin_idx'),
+            # Next attempt number is MAX(attempt_number) per user and test
+            models.Index(fields=['user', 'test_card', 'attempt_number']),
+        ]
+
     def __str__(self):
         return f"{self.user.username} → {self.test_card.name} (Attempt {self.attempt_number})"
 
@@ -183,16 +281,24 @@ class Answer(models.Model):
         help_text="The user's reason for marking the question."
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['submission', 'is_correct']),
+        ]
+
     def save(self, *args, **kwargs):
-        # Auto-check correctness before saving if an option was selected
-        if self.selected_option:
-            self.is_correct = (self.selected_option == self.question.correct_option)
-        else:
+        # Auto-check correctness before saving if an option was selected.
+        # Only use the question when it is already loaded, so saving an answer
+        # never triggers an extra query; otherwise the caller is expected to
+        # have set is_correct (e.g. when grading with bulk_create).
+        if not self.selected_option:
             self.is_correct = False
+        elif Answer.question.is_cached(self):
+            self.is_correct = (self.selected_option == self.question.correct_option)
         super().save(*args, **kwargs)
 
     def __str__(self):
-        return f"Ans for Q{self.question.id} in Sub-{self.submission.id}"
+        return f"Ans for Q{self.question_id} in Sub-{self.submission_id}"
 
 
 class RevisionLog(models.Model):
@@ -215,7 +321,56 @@ class RevisionLog(models.Model):
 
     class Meta:
         # Prevent adding the same question for the same reason from the same attempt
-        unique_together = ('user', 'question', 'source_test_card', 'source_submission_attempt')
+        unique_together = ('user', 'question', 'reason', 'source_test_card', 'source_submission_attempt')
+        indexes = [
+            # Backs the (question, user) grouping in most_common_question_ids()
+            models.Index(fields=['question', 'user']),
+        ]
+
+    @classmethod
+    def most_common_question_ids(cls, limit):
+        """
+        IDs of the questions logged by the most distinct users.
+        The (question, user) pairs are de-duplicated in a GROUP BY first and
+        then counted with COUNT(*), which is much cheaper than COUNT(DISTINCT).
+        """
+        table = cls._meta.db_table
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT question_id, COUNT(*) AS user_count
+                FROM (
+                    SELECT question_id, user_id FROM {table}
+                    GROUP BY question_id, user_id
+                ) AS pairs
+                GROUP BY question_id
+                ORDER BY user_count DESC
+                LIMIT %s
+                """,
+                [limit]
+            )
+            return [row[0] for row in cursor.fetchall()]
+
+    @classmethod
+    def bulk_log(cls, user, question_ids, reason, source_test_card, source_submission_attempt):
+        """
+        Add several questions to a user's revision log in a single INSERT.
+        Entries that already exist are skipped by the unique constraint,
+        so prefer this over calling get_or_create() per question.
+        """
+        return cls.objects.bulk_create(
+            [
+                cls(
+                    user=user,
+                    question_id=question_id,
+                    reason=reason,
+                    source_test_card=source_test_card,
+                    source_submission_attempt=source_submission_attempt
+                )
+                for question_id in question_ids
+            ],
+            ignore_conflicts=True
+        )
 
     def __str__(self):
         return f"{self.user.username}'s revision for Q{self.question.id} ({self.get_reason_display()})"
\ No newline at end of file
@@ -2,6 +2,7 @@
 
 from rest_framework import permissions
 from django.utils import timezone
+from subscriptions.models import UserSubscription
 
 class IsAdminOrReadOnly(permissions.BasePermission):
     """
@@ -46,10 +47,5 @@ class IsSubscribed(permissions.BasePermission):
         if not request.user or not request.user.is_authenticated:
             return False
         
-        # Check our custom property on the UserProfile
-        # The related_name 'profile' from accounts/models.py is used here.
-        try:
-            return request.user.profile.has_active_subscription
-        except AttributeError:
-            # This can happen if the UserProfile signal didn't run
-            return False
+        # A single EXISTS on the (user, end_date) index, without loading the profile
+        return UserSubscription.objects.filter(user_id=request.user.id).active().exists()
@@ -1,7 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth.models import User
 from accounts.models import UserProfile 
-from collections import defaultdict
+from collections import Counter, defaultdict
+from django.db.models import Count, F, Manager, Max, Q
 from .models import (
     Exam,
     SubExam,
@@ -31,14 +32,10 @@ class UserSerializer(serializers.ModelSerializer):
 
 class TestCardListSerializer(serializers.ModelSerializer):
     """A lightweight serializer for listing TestCards."""
-    num_questions = serializers.SerializerMethodField()
-
     class Meta:
         model = TestCard
+        # num_questions is a stored column, so listing cards needs no COUNT queries
         fields = ['id', 'name', 'test_type', 'order', 'price_points','duration_minutes','num_questions']
-
-    def get_num_questions(self, obj):
-     return obj.questions.count()
     
    
 
@@ -122,9 +119,8 @@ class TestCardDetailSerializer(serializers.ModelSerializer):
 
 class AnswerSubmitSerializer(serializers.ModelSerializer):
     """Serializer used by the user to submit an answer."""
-    question_id = serializers.PrimaryKeyRelatedField(
-        queryset=Question.objects.all(), source='question', write_only=True
-    )
+    # A plain id; TestSubmissionCreateSerializer checks all of them in one query
+    question_id = serializers.IntegerField(write_only=True)
     
     class Meta:
         model = Answer
@@ -139,6 +135,39 @@ class TestSubmissionCreateSerializer(serializers.ModelSerializer):
         model = TestSubmission
         fields = ['test_card', 'answers']
 
+    def validate(self, attrs):
+        question_ids = {answer['question_id'] for answer in attrs.get('answers', [])}
+        # Kept for create(), which grades the answers without loading questions
+        self._correct_options = dict(Question.objects.filter(
+            test_card=attrs['test_card'], id__in=question_ids
+        ).values_list('id', 'correct_option'))
+        invalid_ids = question_ids - self._correct_options.keys()
+        if invalid_ids:
+            raise serializers.ValidationError({
+                'answers': f"Questions {sorted(invalid_ids)} do not belong to this test."
+            })
+        return attrs
+
+    def create(self, validated_data):
+        answers_data = validated_data.pop('answers', [])
+        validated_data.setdefault('attempt_number', (TestSubmission.objects.filter(
+            user=validated_data['user'], test_card=validated_data['test_card']
+        ).aggregate(m=Max('attempt_number'))['m'] or 0) + 1)
+        submission = TestSubmission.objects.create(**validated_data)
+
+        # bulk_create skips Answer.save(), so is_correct is set here
+        answers = []
+        for answer in answers_data:
+            # Skipped or marked-only answers leave selected_option out
+            selected = answer.get('selected_option')
+            answers.append(Answer(
+                submission=submission,
+                is_correct=bool(selected) and selected == self._correct_options[answer['question_id']],
+                **answer
+            ))
+        Answer.objects.bulk_create(answers, batch_size=500)
+        return submission
+
 
 # --- Serializers for Displaying Results ---
 
@@ -161,12 +190,90 @@ class AnswerResultSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+def _category_stats(totals, correct):
+    """Correct/total/percentage per category, in first-seen order."""
+    return {
+        key: {
+            'correct': correct[key],
+            'total': total,
+            'percentage': (correct[key] / total) * 100 if total > 0 else 0,
+        }
+        for key, total in totals.items()
+    }
+
+
+def build_performance_analysis(submission, rows):
+    """
+    Folds the grouped answer counts of one submission into the accuracy,
+    by-section and by-difficulty stats shown with its result.
+    """
+    # Answers are only written when the test is submitted
+    if submission.status != TestSubmission.Status.COMPLETED or not rows:
+        return None
+
+    # Overall counts were stored on the submission when it was scored
+    attempted_count = submission.attempted_count
+    correct_count = submission.correct_count
+
+    # Rows are already grouped by the database, so this only sums a handful
+    # of counts per section and difficulty
+    section_totals, section_correct = Counter(), Counter()
+    difficulty_totals, difficulty_correct = Counter(), Counter()
+
+    for row in rows:
+        section_totals[row['section']] += row['total']
+        section_correct[row['section']] += row['correct']
+        difficulty_totals[row['difficulty']] += row['total']
+        difficulty_correct[row['difficulty']] += row['correct']
+
+    by_section = _category_stats(section_totals, section_correct)
+    by_difficulty = _category_stats(difficulty_totals, difficulty_correct)
+
+    # Assemble the final analysis object
+    return {
+        'accuracy': (correct_count / attempted_count) * 100 if attempted_count > 0 else 0,
+        'by_section': by_section,
+        'by_difficulty': by_difficulty,
+        # You can add more logic here for skill proficiency or trends if needed
+    }
+
+
+def attach_performance_analysis(submissions):
+    """
+    Loads per-section/per-difficulty answer counts for the given submissions
+    in one GROUP BY query and stores the resulting analysis on each one as
+    `performance_analysis`.
+    """
+    stats = defaultdict(list)
+    rows = Answer.objects.filter(
+        submission__in=[submission.pk for submission in submissions]
+    ).values(
+        'submission_id', section=F('question__section'), difficulty=F('question__difficulty')
+    ).annotate(
+        total=Count('id'),
+        correct=Count('id', filter=Q(is_correct=True)),
+    ).order_by()
+    for row in rows:
+        stats[row['submission_id']].append(row)
+    for submission in submissions:
+        submission.performance_analysis = build_performance_analysis(submission, stats[submission.pk])
+
+
+class TestSubmissionResultListSerializer(serializers.ListSerializer):
+    """Computes the performance analysis of a whole page of submissions at once."""
+    def to_representation(self, data):
+        submissions = list(data.all() if isinstance(data, Manager) else data)
+        attach_performance_analysis(submissions)
+        return super().to_representation(submissions)
+
+
 class TestSubmissionResultSerializer(serializers.ModelSerializer):
-    performance_analysis = serializers.SerializerMethodField()
     """
     The main serializer for showing a user their complete test result,
     including all questions, their answers, and the correct answers.
     """
+    # Precomputed by attach_performance_analysis, not per field lookup
+    performance_analysis = serializers.DictField(read_only=True, allow_null=True)
     answers = AnswerResultSerializer(many=True, read_only=True)
     test_card = TestCardListSerializer(read_only=True)
     user = UserSerializer(read_only=True)
@@ -177,55 +284,13 @@ class TestSubmissionResultSerializer(serializers.ModelSerializer):
             'id', 'user', 'test_card', 'attempt_number', 'score',
             'percentage', 'reward_points_earned', 'status', 'finished_at', 'answers','performance_analysis'
         ]
-    def get_performance_analysis(self, obj):
-        """
-        Calculates detailed performance stats for the submission.
-        """
-        answers = obj.answers.select_related('question').all()
-        
-        if not answers:
-            return None
-
-        total_questions = obj.test_card.questions.count()
-        attempted_count = 0
-        correct_count = 0
-
-        by_section = defaultdict(lambda: {'correct': 0, 'total': 0})
-        by_difficulty = defaultdict(lambda: {'correct': 0, 'total': 0})
-
-        for answer in answers:
-            question = answer.question
-            section = question.section
-            difficulty = question.difficulty
-
-            # Aggregate stats for sections and difficulty
-            by_section[section]['total'] += 1
-            by_difficulty[difficulty]['total'] += 1
-            
-            if answer.selected_option:
-                attempted_count += 1
-            
-            if answer.is_correct:
-                correct_count += 1
-                by_section[section]['correct'] += 1
-                by_difficulty[difficulty]['correct'] += 1
-        
-        # Calculate percentages for each category
-        for section_stats in by_section.values():
-            section_stats['percentage'] = (section_stats['correct'] / section_stats['total']) * 100 if section_stats['total'] > 0 else 0
-        
-        for diff_stats in by_difficulty.values():
-            diff_stats['percentage'] = (diff_stats['correct'] / diff_stats['total']) * 100 if diff_stats['total'] > 0 else 0
-
-        # Assemble the final analysis object
-        analysis = {
-            'accuracy': (correct_count / attempted_count) * 100 if attempted_count > 0 else 0,
-            'by_section': dict(by_section),
-            'by_difficulty': dict(by_difficulty),
-            # You can add more logic here for skill proficiency or trends if needed
-        }
-        
-        return analysis
+        list_serializer_class = TestSubmissionResultListSerializer
+
+    def to_representation(self, instance):
+        # A single result (retrieve, submit_test) is not routed through the list serializer
+        if not hasattr(instance, 'performance_analysis'):
+            attach_performance_analysis([instance])
+        return super().to_representation(instance)
 # -----------------------------------------------------------------------------
 # USER PROGRESS AND REVISION SERIALIZERS
 # -----------------------------------------------------------------------------
@@ -0,0 +1,120 @@
+# your_app/signals.py
+
+from datetime import timedelta
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+from accounts.models import UserProfile, STREAK_DAILY_GOAL
+from .models import Question, SubExam, TestCard, TestSubmission
+
+
+@receiver(post_save, sender=TestSubmission)
+def update_user_streak(sender, instance, **kwargs):
+    """
+    Extends the user's stored streak when a completed submission brings
+    its day up to the daily test goal.
+    """
+    if instance.status != TestSubmission.Status.COMPLETED or instance.finished_at is None:
+        return
+
+    day = timezone.localdate(instance.finished_at)
+    profile = UserProfile.objects.get(user_id=instance.user_id)
+
+    # This day has already been counted
+    if profile.last_streak_date is not None and profile.last_streak_date >= day:
+        return
+
+    tests_on_day = TestSubmission.objects.filter(
+        user_id=instance.user_id,
+        status=TestSubmission.Status.COMPLETED,
+        finished_at__date=day
+    ).count()
+    if tests_on_day < STREAK_DAILY_GOAL:
+        return
+
+    if profile.last_streak_date == day - timedelta(days=1):
+        profile.current_streak += 1
+    else:
+        profile.current_streak = 1
+    profile.last_streak_date = day
+    profile.save(update_fields=['current_streak', 'last_streak_date'])
+
+
+@receiver(pre_save, sender=Question)
+def remember_question_test_card(sender, instance, update_fields=None, **kwargs):
+    """Remembers the test card an existing question belonged to before this save."""
+    instance._previous_test_card_id = None
+    if instance.pk is None:
+        return
+    if update_fields is not None and not {'test_card', 'test_card_id'} & update_fields:
+        # The card is not being written, so it cannot change; skip the lookup
+        instance._previous_test_card_id = instance.test_card_id
+        return
+    instance._previous_test_card_id = Question.objects.filter(
+        pk=instance.pk
+    ).values_list('test_card_id', flat=True).first()
+
+
+@receiver(post_save, sender=Question)
+def update_test_card_question_count(sender, instance, created, **kwargs):
+    """Keeps TestCard.num_questions in step with its questions."""
+    previous_test_card_id = getattr(instance, '_previous_test_card_id', None)
+    if not created and previous_test_card_id == instance.test_card_id:
+        # An edit that kept the question on its card changes no count
+        return
+    test_card_ids = {instance.test_card_id}
+    if previous_test_card_id is not None:
+        test_card_ids.add(previous_test_card_id)
+    TestCard.refresh_num_questions(*test_card_ids)
+
+
+@receiver(post_delete, sender=Question)
+def update_test_card_question_count_on_delete(sender, instance, **kwargs):
+    """Recounts the card a deleted question belonged to."""
+    TestCard.refresh_num_questions(instance.test_card_id)
+
+
+# The TestCard fields that decide a sub-exam's first subject-wise test
+TEST_CARD_PLACEMENT_FIELDS = {'sub_exam', 'sub_exam_id', 'test_type', 'order'}
+
+
+def test_card_placement(test_card):
+    return (test_card.sub_exam_id, test_card.test_type, test_card.order)
+
+
+@receiver(pre_save, sender=TestCard)
+def remember_test_card_placement(sender, instance, update_fields=None, **kwargs):
+    """Remembers the sub-exam, type and order an existing test card had before this save."""
+    instance._previous_placement = None
+    if instance._state.adding:
+        return
+    if update_fields is not None and not TEST_CARD_PLACEMENT_FIELDS & update_fields:
+        # None of them is being written, so they cannot change; skip the lookup
+        instance._previous_placement = test_card_placement(instance)
+        return
+    instance._previous_placement = TestCard.objects.filter(
+        pk=instance.pk
+    ).values_list('sub_exam_id', 'test_type', 'order').first()
+
+
+@receiver(post_save, sender=TestCard)
+def update_first_subject_test(sender, instance, created, **kwargs):
+    """Keeps SubExam.first_subject_test_card in step with its subject-wise tests."""
+    previous_placement = getattr(instance, '_previous_placement', None)
+    if not created and previous_placement == test_card_placement(instance):
+        # Nothing that decides the first test changed
+        return
+    sub_exam_ids = set()
+    if instance.test_type == TestCard.TestType.SUBJECT_WISE:
+        sub_exam_ids.add(instance.sub_exam_id)
+    if previous_placement is not None and previous_placement[1] == TestCard.TestType.SUBJECT_WISE:
+        sub_exam_ids.add(previous_placement[0])
+    if sub_exam_ids:
+        SubExam.refresh_first_subject_test(*sub_exam_ids)
+
+
+@receiver(post_delete, sender=TestCard)
+def update_first_subject_test_on_delete(sender, instance, **kwargs):
+    """Picks a new first subject-wise test when the current one is deleted."""
+    if instance.test_type == TestCard.TestType.SUBJECT_WISE:
+        SubExam.refresh_first_subject_test(instance.sub_exam_id)
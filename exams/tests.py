@@ -1,3 +1,222 @@
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.models import User
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import STREAK_DAILY_GOAL, UserProfile
+from .models import Answer, Exam, Question, SubExam, TestCard, TestSubmission
+
+
+class TestSubmissionCreateTests(TestCase):
+    def setUp(self):
+        exam = Exam.objects.create(id='exam1', name='Exam')
+        sub_exam = SubExam.objects.create(id='sub1', exam=exam, name='Sub Exam')
+        self.test_card = TestCard.objects.create(id='test1', sub_exam=sub_exam, name='Test 1')
+        self.questions = [
+            Question.objects.create(
+                test_card=self.test_card,
+                question_text=f'Question {i}',
+                option_a='A', option_b='B', option_c='C', option_d='D',
+                correct_option='A'
+            )
+            for i in range(2)
+        ]
+        self.user = User.objects.create_user('student', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_answer_without_selected_option_is_graded_incorrect(self):
+        response = self.client.post('/exams/api/submissions/', {
+            'test_card': self.test_card.id,
+            'answers': [
+                {'question_id': self.questions[0].id, 'selected_option': 'A'},
+                # Skipped but marked for review: no selected_option at all
+                {'question_id': self.questions[1].id, 'is_marked': True},
+            ],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        submission = TestSubmission.objects.get(user=self.user)
+        answers = {a.question_id: a for a in Answer.objects.filter(submission=submission)}
+        self.assertTrue(answers[self.questions[0].id].is_correct)
+        self.assertFalse(answers[self.questions[1].id].is_correct)
+        self.assertIsNone(answers[self.questions[1].id].selected_option)
+
+
+class StreakTests(TestCase):
+    def setUp(self):
+        exam = Exam.objects.create(id='exam1', name='Exam')
+        sub_exam = SubExam.objects.create(id='sub1', exam=exam, name='Sub Exam')
+        self.test_card = TestCard.objects.create(id='test1', sub_exam=sub_exam, name='Test 1')
+        self.user = User.objects.create_user('student', password='pass')
+        self.today = timezone.localdate()
+
+    def complete_tests(self, day, count):
+        finished_at = timezone.make_aware(datetime.combine(day, time(12)))
+        for _ in range(count):
+            TestSubmission.objects.create(
+                user=self.user, test_card=self.test_card,
+                status=TestSubmission.Status.COMPLETED, finished_at=finished_at
+            )
+
+    def profile(self):
+        return UserProfile.objects.get(user=self.user)
+
+    def test_streak_grows_on_the_daily_goal_test(self):
+        self.complete_tests(self.today, STREAK_DAILY_GOAL - 1)
+        self.assertEqual(self.profile().current_streak, 0)
+        self.assertIsNone(self.profile().last_streak_date)
+
+        self.complete_tests(self.today, 1)
+        self.assertEqual(self.profile().current_streak, 1)
+        self.assertEqual(self.profile().last_streak_date, self.today)
+
+        # Tests beyond the goal on the same day do not count again
+        self.complete_tests(self.today, 1)
+        self.assertEqual(self.profile().current_streak, 1)
+
+    def test_consecutive_day_extends_streak(self):
+        self.complete_tests(self.today - timedelta(days=1), STREAK_DAILY_GOAL)
+        self.complete_tests(self.today, STREAK_DAILY_GOAL)
+
+        profile = self.profile()
+        self.assertEqual(profile.current_streak, 2)
+        self.assertEqual(profile.last_streak_date, self.today)
+        self.assertEqual(profile.active_streak, 2)
+
+    def test_missed_day_resets_streak(self):
+        self.complete_tests(self.today - timedelta(days=3), STREAK_DAILY_GOAL)
+        self.complete_tests(self.today - timedelta(days=2), STREAK_DAILY_GOAL)
+        profile = self.profile()
+        self.assertEqual(profile.current_streak, 2)
+        # Yesterday was missed, so the stored streak is no longer active
+        self.assertEqual(profile.active_streak, 0)
+
+        self.complete_tests(self.today, STREAK_DAILY_GOAL)
+        profile = self.profile()
+        self.assertEqual(profile.current_streak, 1)
+        self.assertEqual(profile.active_streak, 1)
+
+
+class QuestionCountTests(TestCase):
+    def setUp(self):
+        exam = Exam.objects.create(id='exam1', name='Exam')
+        sub_exam = SubExam.objects.create(id='sub1', exam=exam, name='Sub Exam')
+        self.first = TestCard.objects.create(id='test1', sub_exam=sub_exam, name='Test 1')
+        self.second = TestCard.objects.create(id='test2', sub_exam=sub_exam, name='Test 2')
+
+    def create_question(self, test_card):
+        return Question.objects.create(
+            test_card=test_card, question_text='Question',
+            option_a='A', option_b='B', option_c='C', option_d='D',
+            correct_option='A'
+        )
+
+    def num_questions(self, test_card):
+        return TestCard.objects.values_list('num_questions', flat=True).get(pk=test_card.pk)
+
+    def test_creating_question_counts_it(self):
+        self.create_question(self.first)
+        self.create_question(self.first)
+        self.assertEqual(self.num_questions(self.first), 2)
+        self.assertEqual(self.num_questions(self.second), 0)
+
+    def test_moving_question_recounts_both_cards(self):
+        question = self.create_question(self.first)
+        self.create_question(self.first)
+
+        question.test_card = self.second
+        question.save()
+        self.assertEqual(self.num_questions(self.first), 1)
+        self.assertEqual(self.num_questions(self.second), 1)
+
+    def test_deleting_question_recounts_its_card(self):
+        question = self.create_question(self.first)
+        self.create_question(self.first)
+
+        question.delete()
+        self.assertEqual(self.num_questions(self.first), 1)
+
+    def test_saving_other_fields_skips_the_lookup(self):
+        question = self.create_question(self.first)
+        question.topic = 'Algebra'
+        with self.assertNumQueries(1):
+            question.save(update_fields=['topic'])
+        self.assertEqual(self.num_questions(self.first), 1)
+
+
+class FirstSubjectTestTests(TestCase):
+    def setUp(self):
+        exam = Exam.objects.create(id='exam1', name='Exam')
+        self.sub_exam = SubExam.objects.create(id='sub1', exam=exam, name='Sub Exam')
+        self.other_sub_exam = SubExam.objects.create(id='sub2', exam=exam, name='Other Sub Exam')
+        self.first = TestCard.objects.create(id='test1', sub_exam=self.sub_exam, name='Test 1', order=1)
+        self.second = TestCard.objects.create(id='test2', sub_exam=self.sub_exam, name='Test 2', order=2)
+
+    def first_subject_test_id(self, sub_exam):
+        return SubExam.objects.values_list('first_subject_test_card', flat=True).get(pk=sub_exam.pk)
+
+    def test_created_cards_pick_the_lowest_order(self):
+        self.assertEqual(self.first_subject_test_id(self.sub_exam), 'test1')
+        self.assertIsNone(self.first_subject_test_id(self.other_sub_exam))
+
+    def test_changing_order_or_type_recomputes_it(self):
+        self.second.order = 0
+        self.second.save()
+        self.assertEqual(self.first_subject_test_id(self.sub_exam), 'test2')
+
+        self.second.test_type = TestCard.TestType.FULL_LENGTH
+        self.second.save(update_fields=['test_type'])
+        self.assertEqual(self.first_subject_test_id(self.sub_exam), 'test1')
+
+    def test_moving_card_to_another_sub_exam_updates_both(self):
+        self.first.sub_exam = self.other_sub_exam
+        self.first.save()
+        self.assertEqual(self.first_subject_test_id(self.sub_exam), 'test2')
+        self.assertEqual(self.first_subject_test_id(self.other_sub_exam), 'test1')
+
+    def test_deleting_first_card_promotes_the_next(self):
+        self.first.delete()
+        self.assertEqual(self.first_subject_test_id(self.sub_exam), 'test2')
+
+        self.second.delete()
+        self.assertIsNone(self.first_subject_test_id(self.sub_exam))
+
+    def test_saving_other_fields_skips_the_lookup(self):
+        self.first.name = 'Renamed'
+        with self.assertNumQueries(1):
+            self.first.save(update_fields=['name'])
+
+
+class MyResultsTests(TestCase):
+    url = '/exams/api/submissions/my_results/'
+
+    def setUp(self):
+        exam = Exam.objects.create(id='exam1', name='Exam')
+        sub_exam = SubExam.objects.create(id='sub1', exam=exam, name='Sub Exam')
+        test_card = TestCard.objects.create(id='test1', sub_exam=sub_exam, name='Test 1')
+        self.user = User.objects.create_user('student', password='pass')
+        for attempt in range(1, 4):
+            TestSubmission.objects.create(
+                user=self.user, test_card=test_card, attempt_number=attempt,
+                status=TestSubmission.Status.COMPLETED,
+                finished_at=timezone.now() - timedelta(hours=attempt)
+            )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_without_limit_returns_plain_list(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsInstance(response.data, list)
+        self.assertEqual([r['attempt_number'] for r in response.data], [1, 2, 3])
 
-# Create your tests here.
+    def test_with_limit_returns_one_page(self):
+        response = self.client.get(self.url, {'limit': 2, 'offset': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual([r['attempt_number'] for r in response.data['results']], [2, 3])
+        self.assertIsNone(response.data['next'])
+        self.assertIsNotNone(response.data['previous'])
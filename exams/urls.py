@@ -41,6 +41,7 @@ urlpatterns = [
 # GET    /api/sub-exams/{id}/study_notes/         - Get study notes for sub-exam
 # GET    /api/sub-exams/{id}/mind_maps/           - Get mind maps for sub-exam
 # GET    /api/sub-exams/{id}/flashcards/          - Get flashcards for sub-exam
+# GET    /api/sub-exams/{id}/learning_materials/  - Get notes, mind maps and flashcards together
 #
 # TEST CARDS:
 # GET    /api/test-cards/                         - List all test cards (filter: ?sub_exam=X&test_type=Y)
@@ -53,7 +54,7 @@ urlpatterns = [
 #        Body: {"test_card_id": "test123"}
 # POST   /api/submissions/{id}/submit_test/       - Submit completed test
 #        Body: {"answers": [{"question_id": 1, "selected_option": "A", "is_marked": true, "mark_reason": "GUESS"}]}
-# GET    /api/submissions/my_results/             - Get all user's results (filter: ?test_card_id=X)
+# GET    /api/submissions/my_results/             - Get all user's results (filter: ?test_card_id=X, page: ?limit=N&offset=M)
 # GET    /api/submissions/{id}/                   - Get specific submission result
 # GET    /api/submissions/performance_summary/    - Get overall performance stats
 #
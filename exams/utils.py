@@ -1,35 +1,66 @@
 # your_app/utils.py
 
-from django.db.models import Count, Avg, Q, Sum, Case, When, F, Window
+from django.db.models import Count, Avg, Max, Min, Q, Sum, Case, When, Exists, F, OuterRef, Window
 
-from .models import TestSubmission, RevisionLog, Question, TestCard,Answer
-from django.db.models.functions import TruncDay, TruncWeek, TruncMonth, Rank, ExtractHour
+from .models import TestSubmission, RevisionLog, Question, TestCard, UnlockedTestCard, Answer
+from django.db.models.functions import TruncDate, TruncDay, TruncWeek, TruncMonth, Rank, ExtractHour
 from datetime import timedelta
+from django.core.cache import cache
 from django.utils import timezone
 
+# Above this many submissions the id filter stays a subquery
+INLINE_SUBMISSION_IDS_LIMIT = 2000
+
+PERFORMANCE_CACHE_TIMEOUT = 3600  # seconds
+
+COMMON_QUESTIONS_CACHE_KEY = 'weekly_quiz_common_questions_v1'
+COMMON_QUESTIONS_CACHE_TIMEOUT = 300  # seconds
+
+# Aggregate expressions built once and reused by every analytics call;
+# Django copies them when resolving, so sharing them is safe.
+CORRECT_ANSWERS = Count(Case(When(is_correct=True, then=1)))
+WRONG_ANSWERS = Count(Case(When(is_correct=False, selected_option__isnull=False, then=1)))
+SKIPPED_ANSWERS = Count(Case(When(selected_option__isnull=True, then=1)))
+SUBMISSION_ACCURACY = Avg(Case(When(answers__is_correct=True, then=1.0), default=0.0)) * 100
+
+
+def performance_cache_key(prefix, user, *parts):
+    """
+    Cache key for a user's analytics payload. It includes the finish time of
+    the user's latest completed test, so a new submission makes older entries
+    unreachable; the date makes it roll over with the time windows.
+    """
+    stamp = TestSubmission.objects.completed_for(user).aggregate(m=Max('finished_at'))['m']
+    parts = ':'.join(str(part) for part in parts)
+    return f"{prefix}:{user.pk}:{parts}:{timezone.now().date()}:{stamp.timestamp() if stamp else 0}"
 
 
 def get_user_performance_analytics(user):
     """
     Generate detailed performance analytics for a user.
     """
-    submissions = TestSubmission.objects.filter(
-        user=user,
-        status=TestSubmission.Status.COMPLETED
+    submissions = TestSubmission.objects.completed_for(user)
+    
+    # One scan for the count and all score statistics
+    stats = submissions.aggregate(
+        n=Count('id'),
+        avg=Avg('percentage'),
+        hi=Max('percentage'),
+        lo=Min('percentage')
     )
     
-    if not submissions.exists():
+    if stats['n'] == 0:
         return {
             'total_tests': 0,
             'message': 'No completed tests yet'
         }
     
     analytics = {
-        'total_tests_completed': submissions.count(),
+        'total_tests_completed': stats['n'],
         'total_reward_points': user.profile.reward_points,
-        'overall_average': submissions.aggregate(Avg('percentage'))['percentage__avg'],
-        'highest_score': submissions.order_by('-percentage').first().percentage,
-        'lowest_score': submissions.order_by('percentage').first().percentage,
+        'overall_average': stats['avg'],
+        'highest_score': stats['hi'],
+        'lowest_score': stats['lo'],
         'subject_wise_performance': [],
         'recent_tests': []
     }
@@ -51,8 +82,8 @@ def get_user_performance_analytics(user):
         'test_card__name',
         'percentage',
         'attempt_number',
-        'finished_at'
-        'test_card_id', # ADD THIS
+        'finished_at',
+        'test_card_id',
     )
     analytics['recent_tests'] = list(recent)
     
@@ -79,50 +110,47 @@ def get_next_unlockable_tests(user, sub_exam):
     """
     Get the tests that could be unlocked next for a user in a sub-exam.
     """
-    # Get all subject-wise tests for this sub-exam
-    all_tests = TestCard.objects.filter(
+    # The first subject-wise test in this sub-exam the user has not unlocked;
+    # None when all tests are unlocked.
+    return TestCard.objects.filter(
         sub_exam=sub_exam,
         test_type=TestCard.TestType.SUBJECT_WISE
-    ).order_by('order')
-    
-    # Get unlocked tests
-    unlocked_ids = user.unlocked_tests.filter(
-        test_card__sub_exam=sub_exam
-    ).values_list('test_card_id', flat=True)
-    
-    # Find the first locked test
-    for test in all_tests:
-        if test.id not in unlocked_ids:
-            return test
+    ).annotate(
+        is_unlocked=Exists(UnlockedTestCard.objects.filter(user=user, test_card=OuterRef('pk')))
+    ).filter(is_unlocked=False).order_by('order').first()
+
+
+def is_subject_test_unlocked(user, test_card):
+    """
+    Check if a subject-wise test is unlocked based on progression logic.
+    First test is always unlocked. Others unlock based on previous performance.
+    """
+    # First test is always unlocked; its id is stored on the sub-exam, so
+    # callers should select_related('sub_exam') when loading the test card
+    if test_card.pk == test_card.sub_exam.first_subject_test_card_id:
+        return True
     
-    return None  # All tests unlocked
+    # Check if user has unlocked this specific test
+    return UnlockedTestCard.objects.filter(user=user, test_card=test_card).exists()
 
 
 def calculate_streak(user):
     """
     Calculate the user's current test-taking streak (consecutive days).
     """
+    # One row per active day, newest first; the loop stops at the first gap
+    days = TestSubmission.objects.completed_for(user).annotate(
+        day=TruncDate('finished_at')
+    ).order_by('-day').values_list('day', flat=True).distinct()
     
-    submissions = TestSubmission.objects.filter(
-        user=user,
-        status=TestSubmission.Status.COMPLETED
-    ).order_by('-finished_at')
+    streak = 0
+    last_date = None
     
-    if not submissions.exists():
-        return 0
-    
-    streak = 1
-    last_date = submissions.first().finished_at.date()
-    
-    for submission in submissions[1:]:
-        current_date = submission.finished_at.date()
-        diff = (last_date - current_date).days
-        
-        if diff == 1:
-            streak += 1
-            last_date = current_date
-        elif diff > 1:
+    for current_date in days.iterator():
+        if last_date is not None and (last_date - current_date).days > 1:
             break
+        streak += 1
+        last_date = current_date
     
     return streak
 
@@ -163,6 +191,7 @@ def prepare_global_quiz_questions(limit=25):
 def get_advanced_performance_data(user, time_filter='month'):
     """
     Gathers all analytics data needed for the advanced performance hub dashboard.
+    The grouped sections are one-shot iterators meant to be serialized once.
     """
     now = timezone.now()
     if time_filter == 'week':
@@ -172,18 +201,29 @@ def get_advanced_performance_data(user, time_filter='month'):
     else: # all-time
         start_date = None
 
-    submissions = TestSubmission.objects.filter(user=user, status=TestSubmission.Status.COMPLETED)
+    submissions = TestSubmission.objects.completed_for(user)
     if start_date:
         submissions = submissions.filter(finished_at__gte=start_date)
 
-    if not submissions.exists():
+    # === Calculate Key Metrics ===
+    # Answer counts are stored on each submission, so one scan covers them all
+    aggregates = submissions.aggregate(
+        avg_score=Avg('percentage'),
+        total_tests=Count('id'),
+        correct=Sum('correct_count'),
+        attempted=Sum('attempted_count')
+    )
+    if aggregates['total_tests'] == 0:
         return {'message': 'No data for the selected period.'}
 
-    # === Calculate Key Metrics ===
-    aggregates = submissions.aggregate(avg_score=Avg('percentage'), total_tests=Count('id'))
-    total_answers = Answer.objects.filter(submission__in=submissions)
-    correct_answers = total_answers.filter(is_correct=True).count()
-    attempted_answers = total_answers.filter(selected_option__isnull=False).count()
+    correct_answers = aggregates['correct'] or 0
+    attempted_answers = aggregates['attempted'] or 0
+    # Hand small id sets to later queries as a literal list rather than
+    # embedding the whole submissions filter as a nested SELECT again.
+    if aggregates['total_tests'] <= INLINE_SUBMISSION_IDS_LIMIT:
+        sub_ids = list(submissions.values_list('pk', flat=True))
+    else:
+        sub_ids = submissions.values('pk')
 
     # === Performance Trend (Grouped by Week) ===
     performance_trend = submissions.annotate(
@@ -197,14 +237,14 @@ def get_advanced_performance_data(user, time_filter='month'):
     subject_performance = submissions.values('test_card__sub_exam__name').annotate(
         score=Avg('percentage'),
         tests=Count('id'),
-        accuracy=Avg(Case(When(answers__is_correct=True, then=1.0), default=0.0)) * 100
+        accuracy=SUBMISSION_ACCURACY
     ).order_by('-score')
 
     # === Topic/Question Type Analysis ===
-    topic_analysis = Answer.objects.filter(submission__in=submissions).values('question__topic').annotate(
-        correct=Count(Case(When(is_correct=True, then=1))),
-        wrong=Count(Case(When(is_correct=False, selected_option__isnull=False, then=1))),
-        skipped=Count(Case(When(selected_option__isnull=True, then=1))),
+    topic_analysis = Answer.objects.filter(submission_id__in=sub_ids).values('question__topic').annotate(
+        correct=CORRECT_ANSWERS,
+        wrong=WRONG_ANSWERS,
+        skipped=SKIPPED_ANSWERS,
         total=Count('id')
     ).filter(question__topic__isnull=False).exclude(question__topic__exact='')
 
@@ -224,10 +264,12 @@ def get_advanced_performance_data(user, time_filter='month'):
             'study_streak': calculate_streak(user),
             'accuracy': (correct_answers / attempted_answers) * 100 if attempted_answers > 0 else 0,
         },
-        'performance_trend': list(performance_trend),
-        'subject_performance': list(subject_performance),
-        'question_analysis': list(topic_analysis),
-        'learning_pattern': list(learning_pattern),
+        # Grouped rows are streamed into PerformanceHubSerializer's ListFields
+        # rather than copied into intermediate lists first
+        'performance_trend': performance_trend.iterator(chunk_size=500),
+        'subject_performance': subject_performance.iterator(chunk_size=500),
+        'question_analysis': topic_analysis.iterator(chunk_size=500),
+        'learning_pattern': learning_pattern.iterator(chunk_size=500),
         'recent_activity': list(submissions.order_by('-finished_at')[:4].values(
             'id', 'test_card__name', 'percentage', 'finished_at'
         )),
@@ -236,3 +278,17 @@ def get_advanced_performance_data(user, time_filter='month'):
     }
     return data
 
+
+def get_common_question_ids(limit=25):
+    """
+    The questions most users have in their revision logs, for the weekly quiz.
+    The aggregate scans the whole RevisionLog table, so it is cached briefly
+    while admins create quizzes. An empty result is not cached.
+    """
+    key = f'{COMMON_QUESTIONS_CACHE_KEY}:{limit}'
+    question_ids = cache.get(key)
+    if question_ids is None:
+        question_ids = RevisionLog.most_common_question_ids(limit)
+        if question_ids:
+            cache.set(key, question_ids, timeout=COMMON_QUESTIONS_CACHE_TIMEOUT)
+    return question_ids
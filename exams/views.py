@@ -1,16 +1,20 @@
 # your_app/views.py
 
+from collections import defaultdict
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
+from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
+from django.core.cache import cache
 from django.utils import timezone
-from django.db.models import Count, Q, Avg , Prefetch
+from django.db.models import Count, Exists, F, Max, OuterRef, Q, Avg , Prefetch
 from django.db import transaction
 from .serializers import SubExamWithFullLengthTestsSerializer, DashboardDataSerializer,PerformanceHubSerializer
-from .utils import get_user_performance_analytics ,get_advanced_performance_data
+from .utils import get_user_performance_analytics ,get_advanced_performance_data, get_common_question_ids, is_subject_test_unlocked, performance_cache_key, PERFORMANCE_CACHE_TIMEOUT
 from .permissions import IsSubscribed # <-- IMPORT YOUR NEW PERMISSION
+from accounts.utils import invalidate_profile_cache
 
 
 
@@ -34,7 +38,10 @@ from .serializers import (
 
 class ExamViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for listing and retrieving exams with their sub-exams."""
-    queryset = Exam.objects.all().prefetch_related('sub_exams__test_cards')
+    # The nested SubExamSerializer only renders id and name
+    queryset = Exam.objects.all().prefetch_related(
+        Prefetch('sub_exams', queryset=SubExam.objects.only('id', 'name', 'exam_id'))
+    )
     serializer_class = ExamSerializer
     
 
@@ -52,11 +59,13 @@ class ExamViewSet(viewsets.ReadOnlyModelViewSet):
         if has_subject_tests:
             # If the parameter is present, apply the filter.
             # This looks through the relationships: Exam -> SubExam -> TestCard
-            # and checks the test_type field.
-            # .distinct() ensures each Exam is only listed once.
-            queryset = queryset.filter(
-                sub_exams__test_cards__test_type='SUBJECT'
-            ).distinct()
+            # and checks the test_type field. An EXISTS subquery keeps each
+            # Exam once without joining every test card and de-duplicating.
+            subject_tests = TestCard.objects.filter(
+                sub_exam__exam=OuterRef('pk'),
+                test_type=TestCard.TestType.SUBJECT_WISE
+            )
+            queryset = queryset.filter(Exists(subject_tests))
             
         return queryset
 
@@ -65,7 +74,7 @@ class ExamViewSet(viewsets.ReadOnlyModelViewSet):
 
 class SubExamViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for retrieving sub-exam details."""
-    queryset = SubExam.objects.all().prefetch_related('test_cards')
+    queryset = SubExam.objects.only('id', 'name')
     serializer_class = SubExamSerializer
     permission_classes = [IsAuthenticated]
      
@@ -77,6 +86,8 @@ class SubExamViewSet(viewsets.ReadOnlyModelViewSet):
         exam_id = self.request.query_params.get('exam', None)
         if exam_id is not None:
             queryset = queryset.filter(exam_id=exam_id)
+        if self.action == 'learning_materials':
+            queryset = queryset.prefetch_related('study_notes', 'mind_maps', 'flashcards')
         return queryset
 
     @action(detail=False, methods=['get'])
@@ -87,12 +98,17 @@ class SubExamViewSet(viewsets.ReadOnlyModelViewSet):
         """
         # This queryset is more efficient.
         # It finds SubExams with full-length tests and then pre-fetches ONLY those tests.
-        queryset = SubExam.objects.annotate(
-            full_test_count=Count('test_cards', filter=Q(test_cards__test_type=TestCard.TestType.FULL_LENGTH))
-        ).filter(full_test_count__gt=0).prefetch_related(
+        full_length_tests = TestCard.objects.filter(test_type=TestCard.TestType.FULL_LENGTH)
+        queryset = SubExam.objects.only('id', 'name').filter(
+            Exists(full_length_tests.filter(sub_exam=OuterRef('pk')))
+        ).prefetch_related(
+            # num_questions is stored on the card, so this is the last query
             Prefetch(
                 'test_cards',
-                queryset=TestCard.objects.filter(test_type=TestCard.TestType.FULL_LENGTH),
+                queryset=full_length_tests.only(
+                    'id', 'sub_exam_id', 'name', 'test_type', 'order',
+                    'price_points', 'duration_minutes', 'num_questions',
+                ),
             )
         )
         
@@ -125,6 +141,19 @@ class SubExamViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = FlashcardSerializer(flashcards, many=True)
         return Response(serializer.data)
 
+    @action(detail=True, methods=['get'])
+    def learning_materials(self, request, pk=None):
+        """
+        Get study notes, mind maps and flashcards for a sub-exam in one request,
+        with each kind loaded by a single prefetch query.
+        """
+        sub_exam = self.get_object()
+        return Response({
+            'study_notes': StudyNoteSerializer(sub_exam.study_notes.all(), many=True).data,
+            'mind_maps': MindMapSerializer(sub_exam.mind_maps.all(), many=True).data,
+            'flashcards': FlashcardSerializer(sub_exam.flashcards.all(), many=True).data,
+        })
+
 
 # -----------------------------------------------------------------------------
 # TEST CARD VIEWSET
@@ -146,7 +175,7 @@ class TestCardViewSet(viewsets.ReadOnlyModelViewSet):
         
         # Check if it's a subject-wise test (unlocked by progression)
         if test_card.test_type == TestCard.TestType.SUBJECT_WISE:
-            is_unlocked = self._is_subject_test_unlocked(user, test_card)
+            is_unlocked = is_subject_test_unlocked(user, test_card)
             return Response({
                 'test_card_id': test_card.id,
                 'is_unlocked': is_unlocked,
@@ -160,7 +189,8 @@ class TestCardViewSet(viewsets.ReadOnlyModelViewSet):
                 user=user, test_card=test_card
             ).exists()
             
-            user_profile = UserProfile.objects.get(user=user)
+            # Cached on request.user, so later reads in this request are free
+            user_profile = user.profile
             can_afford = user_profile.reward_points >= test_card.price_points
             
             return Response({
@@ -181,28 +211,6 @@ class TestCardViewSet(viewsets.ReadOnlyModelViewSet):
                 'price_points': 0
             })
 
-    def _is_subject_test_unlocked(self, user, test_card):
-        """
-        Check if a subject-wise test is unlocked based on progression logic.
-        First test is always unlocked. Others unlock based on previous performance.
-        """
-        # Get all test cards for this sub_exam ordered by sequence
-        all_tests = TestCard.objects.filter(
-            sub_exam=test_card.sub_exam,
-            test_type=TestCard.TestType.SUBJECT_WISE
-        ).order_by('order')
-        
-        # First test is always unlocked
-        if test_card == all_tests.first():
-            return True
-        
-        # Check if user has unlocked this specific test
-        unlocked = UnlockedTestCard.objects.filter(
-            user=user, test_card=test_card
-        ).exists()
-        
-        return unlocked
-
     @action(detail=True, methods=['post'])
     def unlock_full_length_test(self, request, pk=None):
         """
@@ -218,32 +226,37 @@ class TestCardViewSet(viewsets.ReadOnlyModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        user_profile = UserProfile.objects.get(user=user)
-        
-        # Check if user has enough points
-        if user_profile.reward_points < test_card.price_points:
-            return Response(
-                {
-                    'error': 'Insufficient reward points.',
-                    'required': test_card.price_points,
-                    'available': user_profile.reward_points
-                },
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        profiles = UserProfile.objects.filter(user=user)
         
         # Deduct points and create unlock record
         with transaction.atomic():
-            user_profile.reward_points -= test_card.price_points
-            user_profile.save()
+            # Check and deduct in one UPDATE, so concurrent purchases can't overspend
+            paid = profiles.filter(reward_points__gte=test_card.price_points).update(
+                reward_points=F('reward_points') - test_card.price_points
+            )
+            
+            # Check if user has enough points
+            if not paid:
+                return Response(
+                    {
+                        'error': 'Insufficient reward points.',
+                        'required': test_card.price_points,
+                        'available': profiles.values_list('reward_points', flat=True).get()
+                    },
+                    status=status.HTTP_400_BAD_REQUEST
+                )
             
             unlock_record = UnlockedTestCard.objects.create(
                 user=user,
                 test_card=test_card
             )
         
+        # update() skips the post_save signal that normally clears this
+        invalidate_profile_cache(user.id)
+        
         return Response({
             'message': 'Test unlocked successfully',
-            'remaining_points': user_profile.reward_points,
+            'remaining_points': profiles.values_list('reward_points', flat=True).get(),
             'unlocked_at': unlock_record.unlocked_at
         })
     
@@ -265,7 +278,13 @@ class TestCardViewSet(viewsets.ReadOnlyModelViewSet):
         if test_type:
             queryset = queryset.filter(test_type=test_type)
         
-        return queryset.prefetch_related('questions')
+        if self.action == 'retrieve':
+            # The detail serializer renders every question
+            return queryset.prefetch_related('questions')
+        if self.action == 'check_unlock_status':
+            # The unlock check reads the sub-exam's stored first test
+            return queryset.select_related('sub_exam')
+        return queryset
    
 
 
@@ -273,9 +292,23 @@ class TestCardViewSet(viewsets.ReadOnlyModelViewSet):
 # TEST SUBMISSION VIEWSET
 # -----------------------------------------------------------------------------
 
+class SubmissionResultsPagination(LimitOffsetPagination):
+    """
+    Pages results at the database when the client passes ?limit=&offset=.
+
+    There is deliberately no default_limit: the deployed frontend reads
+    my_results (and the submission list) as a plain JSON array, and a default
+    would switch every response to the {count, next, previous, results}
+    envelope and break it. Without a limit the full list is still returned;
+    set default_limit once the frontend sends ?limit= everywhere.
+    """
+    max_limit = 50
+
+
 class TestSubmissionViewSet(viewsets.ModelViewSet):
     """ViewSet for managing test submissions."""
     permission_classes = [IsAuthenticated] 
+    pagination_class = SubmissionResultsPagination
 
     def get_permissions(self):
         """
@@ -298,45 +331,46 @@ class TestSubmissionViewSet(viewsets.ModelViewSet):
         Validates unlock status and creates a submission record.
         """
         test_card_id = request.data.get('test_card_id')
-        test_card = get_object_or_404(TestCard, id=test_card_id)
+        test_card = get_object_or_404(TestCard.objects.select_related('sub_exam'), id=test_card_id)
         user = request.user
 
+        # Earlier attempts at this test, for the weekly-quiz check and numbering
+        previous_attempts = TestSubmission.objects.filter(
+            user=user, test_card=test_card
+        ).aggregate(count=Count('id'), last=Max('attempt_number'))
         
         # Validate if test is unlocked
         if test_card.test_type == TestCard.TestType.SUBJECT_WISE:
-            if not self._is_subject_test_unlocked_helper(user, test_card):
+            if not is_subject_test_unlocked(user, test_card):
                 return Response(
                     {'error': 'This test is locked. Complete previous tests to unlock.'},
                     status=status.HTTP_403_FORBIDDEN
                 )
         
         elif test_card.test_type == TestCard.TestType.FULL_LENGTH:
-            # Check if user has purchased/unlocked this test
-            unlocked = UnlockedTestCard.objects.filter(
+            # For full-length tests, delete the unlock record after starting
+            # (user must buy again for next attempt). The number of rows deleted
+            # tells us whether the user had purchased/unlocked this test.
+            deleted, _ = UnlockedTestCard.objects.filter(
                 user=user, test_card=test_card
-            ).exists()
+            ).delete()
             
-            if not unlocked:
+            if not deleted:
                 return Response(
                     {'error': 'You must purchase this test first.'},
                     status=status.HTTP_403_FORBIDDEN
                 )
-            # For full-length tests, delete the unlock record after starting
-            # (user must buy again for next attempt)
-            UnlockedTestCard.objects.filter(user=user, test_card=test_card).delete()
           # --- ADD THIS BLOCK to handle the one-time attempt for weekly quizzes ---
         elif test_card.test_type == TestCard.TestType.WEEKLY_QUIZ:
             # Check if any submission (in-progress or completed) already exists
-             if TestSubmission.objects.filter(user=user, test_card=test_card).exists():
+             if previous_attempts['count']:
                 return Response(
                     {'error': 'You have already attempted this weekly quiz. Only one attempt is allowed.'},
                     status=status.HTTP_403_FORBIDDEN
                 )  
         
         # Get the next attempt number
-        attempt_number = TestSubmission.objects.filter(
-            user=user, test_card=test_card
-        ).count() + 1
+        attempt_number = (previous_attempts['last'] or 0) + 1
         
         # Create submission
         submission = TestSubmission.objects.create(
@@ -354,14 +388,19 @@ class TestSubmissionViewSet(viewsets.ModelViewSet):
     
     def get_queryset(self):
         return TestSubmission.objects.filter(user=self.request.user).select_related(
-            'test_card', 'test_card__sub_exam'
-        ).prefetch_related('answers__question')
+            'user', 'test_card', 'test_card__sub_exam'
+        ).prefetch_related(
+            Prefetch('answers', queryset=Answer.objects.select_related('question'))
+        )
     
     def get_serializer_class(self):
         if self.action == 'create':
             return TestSubmissionCreateSerializer
         return TestSubmissionResultSerializer
 
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
+
 
     @action(detail=True, methods=['post'])
     def submit_test(self, request, pk=None):
@@ -382,27 +421,33 @@ class TestSubmissionViewSet(viewsets.ModelViewSet):
         marked_questions_for_review = []
         
         with transaction.atomic():
+            # Every question of this test, loaded once for all answers
+            questions = submission.test_card.questions.in_bulk()
             new_answers = []
               # Process each answer
             for answer_data in answers_data:
-                question = get_object_or_404(Question, id=answer_data['question_id'])
+                question = questions.get(answer_data['question_id'])
                 
                 # Ensure question belongs to this test
-                if question.test_card != submission.test_card:
+                if question is None:
                     continue
                 
-                answer = Answer.objects.create(
+                selected_option = answer_data.get('selected_option')
+                new_answers.append(Answer(
                     submission=submission,
                     question=question,
-                    selected_option=answer_data.get('selected_option'),
-                    is_marked=answer_data.get('is_marked', False), 
-                )
-                new_answers.append(answer) # <--- ADD THE NEW ANSWER TO THE LIST
-                
-                # Automatically log incorrect answers now.
-                if not answer.is_correct and answer.selected_option:
-                    self._add_to_revision_log(user, answer, submission, is_marked_flow=False)
+                    selected_option=selected_option,
+                    is_marked=answer_data.get('is_marked', False),
+                    # bulk_create skips Answer.save(), so grade the answer here
+                    is_correct=bool(selected_option) and selected_option == question.correct_option,
+                ))
             
+            Answer.objects.bulk_create(new_answers, batch_size=500)
+            
+            # Automatically log incorrect answers now.
+            self._add_to_revision_log(user, new_answers, submission, is_marked_flow=False)
+            
+            for answer in new_answers:
                 # If the user marked it, save it for the next step.
                 if answer.is_marked:
                    marked_questions_for_review.append({
@@ -413,8 +458,10 @@ class TestSubmissionViewSet(viewsets.ModelViewSet):
 
             # Calculate score
             total_score = self._calculate_score(new_answers)
-            total_questions = submission.test_card.questions.count()
-            percentage = (total_score / (total_questions * submission.test_card.questions.first().positive_marks)) * 100 if total_questions > 0 else 0
+            # Both come from the questions already loaded above
+            total_questions = len(questions)
+            max_score = sum(question.positive_marks for question in questions.values())
+            percentage = (total_score / max_score) * 100 if max_score > 0 else 0
             
             # Award reward points based on performance (for subject-wise tests)
             reward_points = 0
@@ -429,21 +476,29 @@ class TestSubmissionViewSet(viewsets.ModelViewSet):
             submission.reward_points_earned = reward_points
             submission.status = TestSubmission.Status.COMPLETED
             submission.finished_at = timezone.now()
-            submission.save()
+            submission.total_questions = total_questions
+            submission.correct_count = sum(1 for answer in new_answers if answer.is_correct)
+            submission.attempted_count = sum(1 for answer in new_answers if answer.selected_option)
+            # Only write what scoring changed; a plain save() still sends post_save,
+            # which the streak and profile-cache signals rely on
+            submission.save(update_fields=[
+                'score', 'percentage', 'reward_points_earned', 'status', 'finished_at',
+                'total_questions', 'correct_count', 'attempted_count',
+            ])
             
             # Award points to user
-            user_profile = UserProfile.objects.get(user=user)
-            user_profile.reward_points += reward_points
-            user_profile.save()
+            if reward_points:
+                UserProfile.award_points([user.id], reward_points)
             
             # Unlock next tests if subject-wise test
             if submission.test_card.test_type == TestCard.TestType.SUBJECT_WISE:
                self._unlock_next_tests(user, submission)
         
-        # Return results
+        # Return results. Reload so the prefetched answers include the ones just created.
+        submission = self.get_queryset().get(pk=submission.pk)
         serializer = self.get_serializer(submission)
         response_data = serializer.data
-        response_data['total_questions'] = submission.test_card.questions.count()
+        response_data['total_questions'] = submission.total_questions
 
         if marked_questions_for_review:
         # If questions were marked, tell the frontend it needs to ask for reasons.
@@ -455,18 +510,6 @@ class TestSubmissionViewSet(viewsets.ModelViewSet):
 
         return Response(response_data)
 
-    def _is_subject_test_unlocked_helper(self, user, test_card):
-        """Helper to check unlock status."""
-        all_tests = TestCard.objects.filter(
-            sub_exam=test_card.sub_exam,
-            test_type=TestCard.TestType.SUBJECT_WISE
-        ).order_by('order')
-        
-        if test_card == all_tests.first():
-            return True
-        
-        return UnlockedTestCard.objects.filter(user=user, test_card=test_card).exists()
-
     def _calculate_score(self, answers_list):
         """Calculate total score for a submission."""
         total_score = 0
@@ -515,39 +558,35 @@ class TestSubmissionViewSet(viewsets.ModelViewSet):
             order__gt=current_test.order
         ).order_by('order')[:unlock_count]
         
-        # Create unlock records
-        for test in next_tests:
-            UnlockedTestCard.objects.get_or_create(
-                user=user,
-                test_card=test
-            )
+        # Create unlock records; tests already unlocked are skipped
+        UnlockedTestCard.bulk_unlock(user, next_tests)
 
-    def _add_to_revision_log(self, user, answer, submission, is_marked_flow=False):
-        """Add question to revision log if it was marked or answered incorrectly."""
-        reasons_to_add = []
-        
-        # Check if incorrect
-        if is_marked_flow:
-        # This flow is for when the user submits reasons from the new page
-         if answer.is_marked and answer.mark_reason:
-            reason_map = {
-                Answer.MarkReason.GUESS: RevisionLog.Reason.MARKED_GUESS,
-                Answer.MarkReason.TIME_PRESSURE: RevisionLog.Reason.MARKED_TIME,
-                Answer.MarkReason.CONCEPT_ERROR: RevisionLog.Reason.MARKED_CONCEPT,
-            }
-            if answer.mark_reason in reason_map:
-                reasons_to_add.append(reason_map[answer.mark_reason])
-        else:
-        # This is for the initial submit: only log incorrect answers automatically
-          if not answer.is_correct and answer.selected_option:
-            reasons_to_add.append(RevisionLog.Reason.INCORRECT)
+    def _add_to_revision_log(self, user, answers, submission, is_marked_flow=False):
+        """Add questions to revision log if they were marked or answered incorrectly."""
+        question_ids_by_reason = defaultdict(list)
+        reason_map = {
+            Answer.MarkReason.GUESS: RevisionLog.Reason.MARKED_GUESS,
+            Answer.MarkReason.TIME_PRESSURE: RevisionLog.Reason.MARKED_TIME,
+            Answer.MarkReason.CONCEPT_ERROR: RevisionLog.Reason.MARKED_CONCEPT,
+        }
         
-        # Add to revision log for each reason
-        for reason in reasons_to_add:
-            RevisionLog.objects.get_or_create(
-                user=user,
-                question=answer.question,
-                reason=reason,
+        for answer in answers:
+            # Check if incorrect
+            if is_marked_flow:
+            # This flow is for when the user submits reasons from the new page
+             if answer.is_marked and answer.mark_reason in reason_map:
+                question_ids_by_reason[reason_map[answer.mark_reason]].append(answer.question_id)
+            else:
+            # This is for the initial submit: only log incorrect answers automatically
+              if not answer.is_correct and answer.selected_option:
+                question_ids_by_reason[RevisionLog.Reason.INCORRECT].append(answer.question_id)
+        
+        # One INSERT per reason; entries already in the log are skipped
+        for reason, question_ids in question_ids_by_reason.items():
+            RevisionLog.bulk_log(
+                user,
+                question_ids,
+                reason,
                 source_test_card=submission.test_card,
                 source_submission_attempt=submission.attempt_number
             )
@@ -563,26 +602,27 @@ class TestSubmissionViewSet(viewsets.ModelViewSet):
         reasons_data = request.data.get('reasons', [])
 
         with transaction.atomic():
+            # Find the answer records we created in the previous step
+            answers = {
+                answer.question_id: answer
+                for answer in submission.answers.filter(
+                    question_id__in=[reason_item.get('question_id') for reason_item in reasons_data]
+                )
+            }
+            updated_answers = []
             for reason_item in reasons_data:
-                question_id = reason_item.get('question_id')
-                reason_key = reason_item.get('reason')  # e.g., 'GUESS', 'TIME', 'CONCEPT'
-
-                try:
-                # Find the answer record we created in the previous step
-                    answer = Answer.objects.get(
-                    submission=submission,
-                    question_id=question_id
-                      )
-                
-                     # Now, update it with the reason provided by the user
-                    answer.mark_reason = reason_key
-                    answer.save()
+                answer = answers.get(reason_item.get('question_id'))
+                if answer is None:
+                    continue
                 
-                    # Finally, add this marked question to the revision log
-                    self._add_to_revision_log(user, answer, submission, is_marked_flow=True)
-
-                except Answer.DoesNotExist:
-                     continue
+                # Now, update it with the reason provided by the user
+                answer.mark_reason = reason_item.get('reason')  # e.g., 'GUESS', 'TIME', 'CONCEPT'
+                updated_answers.append(answer)
+            
+            Answer.objects.bulk_update(updated_answers, ['mark_reason'])
+            
+            # Finally, add these marked questions to the revision log
+            self._add_to_revision_log(user, updated_answers, submission, is_marked_flow=True)
             
         return Response({'status': 'success'}, status=status.HTTP_200_OK)  
                 
@@ -600,6 +640,12 @@ class TestSubmissionViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(test_card_id=test_card_id)
         
         queryset = queryset.order_by('-finished_at')
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            # Answers are only prefetched for the submissions on this page
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
@@ -607,29 +653,29 @@ class TestSubmissionViewSet(viewsets.ModelViewSet):
     def performance_summary(self, request):
         """Get performance summary across all tests."""
         user = request.user
-        submissions = TestSubmission.objects.filter(
-            user=user,
-            status=TestSubmission.Status.COMPLETED
-        ).select_related('test_card')
+        submissions = TestSubmission.objects.completed_for(user)
+        totals = submissions.aggregate(count=Count('id'), avg_percentage=Avg('percentage'))
         
         summary = {
-            'total_tests_completed': submissions.count(),
-            'total_reward_points': UserProfile.objects.get(user=user).reward_points,
-            'average_percentage': submissions.aggregate(
-                avg_percentage=models.Avg('percentage')
-            )['avg_percentage'] or 0,
+            'total_tests_completed': totals['count'],
+            'total_reward_points': user.profile.reward_points,
+            'average_percentage': totals['avg_percentage'] or 0,
             'tests_by_type': {}
         }
         
-        # Group by test type
+        # Group by test type in the database, then list types in their usual order
+        by_type = {
+            row['test_card__test_type']: row
+            for row in submissions.values('test_card__test_type').annotate(
+                count=Count('id'), avg=Avg('percentage')
+            ).order_by()
+        }
         for test_type in TestCard.TestType:
-            type_submissions = submissions.filter(test_card__test_type=test_type.value)
-            if type_submissions.exists():
+            row = by_type.get(test_type.value)
+            if row:
                 summary['tests_by_type'][test_type.label] = {
-                    'count': type_submissions.count(),
-                    'avg_percentage': type_submissions.aggregate(
-                        avg=models.Avg('percentage')
-                    )['avg'] or 0
+                    'count': row['count'],
+                    'avg_percentage': row['avg'] or 0
                 }
         
         return Response(summary)
@@ -648,7 +694,7 @@ class RevisionLogViewSet(viewsets.ReadOnlyModelViewSet):
     def get_queryset(self):
         user = self.request.user
         queryset = RevisionLog.objects.filter(user=user).select_related(
-            'question', 'source_test_card'
+            'user', 'question', 'source_test_card'
         ).order_by('-added_at')
         
         # Filter by reason if provided
@@ -668,13 +714,19 @@ class RevisionLogViewSet(viewsets.ReadOnlyModelViewSet):
         """Get summary of revision log."""
         user = request.user
         
+        entries = RevisionLog.objects.filter(user=user)
+        
         summary = {
-            'total_questions': RevisionLog.objects.filter(user=user).values('question').distinct().count(),
+            'total_questions': entries.aggregate(
+                total=Count('question', distinct=True)
+            )['total'],
             'by_reason': {}
         }
         
+        # One GROUP BY for every reason, listed in their usual order
+        counts = dict(entries.values_list('reason').annotate(count=Count('id')).order_by())
         for reason in RevisionLog.Reason:
-            count = RevisionLog.objects.filter(user=user, reason=reason.value).count()
+            count = counts.get(reason.value, 0)
             if count > 0:
                 summary['by_reason'][reason.label] = count
         
@@ -728,26 +780,12 @@ class ChallengeTestViewSet(viewsets.ModelViewSet):
                 name=challenge_name,
                 test_type=TestCard.TestType.CHALLENGE,
                 duration_minutes=30,
-                reward_points_earned=reward_points
+                reward_points=reward_points
             )
 
             # Duplicate questions for this challenge
-            questions = Question.objects.filter(id__in=revision_questions)
-            for question in questions:
-                Question.objects.create(
-                    test_card=test_card,
-                    question_text=question.question_text,
-                    option_a=question.option_a,
-                    option_b=question.option_b,
-                    option_c=question.option_c,
-                    option_d=question.option_d,
-                    correct_option=question.correct_option,
-                    section=question.section,
-                    topic=question.topic,
-                    difficulty=question.difficulty,
-                    positive_marks=question.positive_marks,
-                    negative_marks=question.negative_marks,
-                )
+            rows = Question.objects.filter(id__in=revision_questions).values(*Question.COPY_FIELDS)
+            Question.bulk_copy(rows, test_card)
 
         return Response({
             'message': 'Challenge created successfully',
@@ -778,11 +816,7 @@ class WeeklyQuizViewSet(viewsets.ModelViewSet):
         reward_points = request.data.get('reward_points', 10)
         
         # Get most common questions from all users' revision logs
-        common_questions = RevisionLog.objects.values('question_id').annotate(
-            user_count=Count('user', distinct=True)
-        ).order_by('-user_count')[:25]
-        
-        question_ids = [q['question_id'] for q in common_questions]
+        question_ids = get_common_question_ids(25)
         
         if not question_ids:
             return Response(
@@ -798,26 +832,12 @@ class WeeklyQuizViewSet(viewsets.ModelViewSet):
                 name=quiz_name,
                 test_type=TestCard.TestType.WEEKLY_QUIZ,
                 duration_minutes=45,
-                reward_points_earned=reward_points
+                reward_points=reward_points
             )
 
             # Duplicate questions for this quiz
-            questions = Question.objects.filter(id__in=question_ids)
-            for question in questions:
-                Question.objects.create(
-                    test_card=test_card,
-                    question_text=question.question_text,
-                    option_a=question.option_a,
-                    option_b=question.option_b,
-                    option_c=question.option_c,
-                    option_d=question.option_d,
-                    correct_option=question.correct_option,
-                    section=question.section,
-                    topic=question.topic,
-                    difficulty=question.difficulty,
-                    positive_marks=question.positive_marks,
-                    negative_marks=question.negative_marks,
-                )
+            rows = Question.objects.filter(id__in=question_ids).values(*Question.COPY_FIELDS)
+            Question.bulk_copy(rows, test_card)
 
         return Response({
             'message': 'Weekly quiz created successfully',
@@ -838,6 +858,11 @@ class DashboardViewSet(viewsets.ViewSet):
         Return a dictionary of all data needed for the user's dashboard.
         """
         user = request.user
+        # Reward points also change when tests are bought, so they are part of the key
+        key = performance_cache_key('dash', user, user.profile.reward_points)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
         
         # Get the main analytics from your util function
         analytics_data = get_user_performance_analytics(user)
@@ -847,6 +872,7 @@ class DashboardViewSet(viewsets.ViewSet):
 
         # Serialize the data
         serializer = DashboardDataSerializer(instance=analytics_data)
+        cache.set(key, serializer.data, timeout=PERFORMANCE_CACHE_TIMEOUT)
         return Response(serializer.data)
     
 class PerformanceHubViewSet(viewsets.ViewSet):
@@ -855,6 +881,10 @@ class PerformanceHubViewSet(viewsets.ViewSet):
     def list(self, request):
         user = request.user
         time_filter = request.query_params.get('filter', 'month')
+        key = performance_cache_key('perfhub', user, time_filter)
+        cached = cache.get(key)
+        if cached is not None:
+            return Response(cached)
         
         data = get_advanced_performance_data(user, time_filter)
         
@@ -862,4 +892,5 @@ class PerformanceHubViewSet(viewsets.ViewSet):
             return Response(data)
             
         serializer = PerformanceHubSerializer(instance=data)
+        cache.set(key, serializer.data, timeout=PERFORMANCE_CACHE_TIMEOUT)
         return Response(serializer.data)
@@ -12,6 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 import environ # 1. Import the package
+from django.core.exceptions import ImproperlyConfigured
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -124,6 +125,20 @@ DATABASES = {
 }
 
 
+# Cache
+# The cached /profile/ payloads and subscription plan list are cleared by
+# signals, which only reach the cache of the process that handled the write.
+# gunicorn runs several workers, so production must point CACHE_URL at a
+# shared backend: Redis (redis://host:6379/1) or memcached
+# (pymemcache://host:11211). A per-process locmem cache would let the other
+# workers keep serving stale data, so it is only allowed with DEBUG on.
+
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://') if DEBUG else env.cache('CACHE_URL'),
+}
+if not DEBUG and CACHES['default']['BACKEND'] == 'django.core.cache.backends.locmem.LocMemCache':
+    raise ImproperlyConfigured('CACHE_URL must point to a shared cache (Redis or memcached) when DEBUG is off.')
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
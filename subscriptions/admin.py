@@ -3,7 +3,8 @@ from django.contrib import admin
 # Register your models here.
 # subscriptions/admin.py
 from django.contrib import admin
-from .models import SubscriptionPlan, UserSubscription
+from .models import PendingOrder, SubscriptionPlan, UserSubscription
 
 admin.site.register(SubscriptionPlan)
-admin.site.register(UserSubscription)
\ No newline at end of file
+admin.site.register(UserSubscription)
+admin.site.register(PendingOrder)
\ No newline at end of file
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-15 21:41
+
+from decimal import Decimal, ROUND_HALF_UP
+
+from django.db import migrations, models
+
+
+def backfill_price_paise(apps, schema_editor):
+    """Convert every existing plan's price to paise, rounding like SubscriptionPlan.save()."""
+    SubscriptionPlan = apps.get_model('subscriptions', 'SubscriptionPlan')
+
+    plans = list(SubscriptionPlan.objects.all())
+    for plan in plans:
+        plan.price_paise = int((plan.price * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+    SubscriptionPlan.objects.bulk_update(plans, ['price_paise'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('subscriptions', '0004_usersubscription_razorpay_order_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='subscriptionplan',
+            name='price_paise',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_price_paise, migrations.RunPython.noop),
+    ]
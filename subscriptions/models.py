@@ -4,19 +4,44 @@ from django.db import models
 # subscriptions/models.py
 
 from django.db import models
+from django.db.models.functions import Now
 from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
+from decimal import Decimal, ROUND_HALF_UP
+from accounts.utils import invalidate_profile_cache
 
 class SubscriptionPlan(models.Model):
     """Stores the details of a plan you offer, e.g., '12-Month Access'."""
     name = models.CharField(max_length=100)
     price = models.DecimalField(max_digits=8, decimal_places=2) # e.g., 299.00
     duration_days = models.IntegerField(default=365)
+    # The price in paise, as Razorpay expects it; kept in step with price by save()
+    price_paise = models.PositiveIntegerField(default=0, editable=False)
+
+    def save(self, *args, **kwargs):
+        # Exact Decimal arithmetic, rounded once to a whole number of paise
+        self.price_paise = int((Decimal(self.price) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+        super().save(*args, **kwargs)
     
     def __str__(self):
         return f"{self.name} (₹{self.price} for {self.duration_days} days)"
 
+class UserSubscriptionQuerySet(models.QuerySet):
+    def active(self):
+        """Subscriptions that have not ended yet."""
+        return self.filter(end_date__gt=timezone.now())
+
+    def with_active(self):
+        """Annotate whether each subscription is active, computed by the database."""
+        return self.annotate(
+            _is_active=models.ExpressionWrapper(
+                models.Q(end_date__gt=Now()),
+                output_field=models.BooleanField()
+            )
+        )
+
+
 class UserSubscription(models.Model):
     """Links a user to a subscription they have purchased."""
     user = models.ForeignKey(
@@ -31,6 +56,21 @@ class UserSubscription(models.Model):
     )
     start_date = models.DateTimeField(auto_now_add=True)
     end_date = models.DateTimeField()
+    # Set for subscriptions bought through Razorpay
+    razorpay_order_id = models.CharField(max_length=64, null=True, blank=True)
+    razorpay_payment_id = models.CharField(max_length=64, null=True, blank=True)
+
+    objects = UserSubscriptionQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Covers the "active subscription for user" lookups
+            models.Index(fields=['user', 'end_date']),
+        ]
+        constraints = [
+            # One subscription per paid order, however many times it is reported
+            models.UniqueConstraint(fields=['razorpay_order_id'], name='uniq_rzp_order'),
+        ]
     
     def save(self, *args, **kwargs):
         # Set the end_date automatically when creating a new subscription
@@ -38,10 +78,58 @@ class UserSubscription(models.Model):
             self.end_date = timezone.now() + timedelta(days=self.plan.duration_days)
         super().save(*args, **kwargs)
 
+    @classmethod
+    def activate(cls, user, plan, razorpay_order_id, razorpay_payment_id):
+        """
+        Create the subscription paid for by a Razorpay order in a single INSERT.
+        verify_payment, payment_callback and the webhook may all report the
+        same order; the unique order id turns the repeats into no-ops.
+        bulk_create skips save() and the signals, so end_date is set and the
+        cached profile is dropped here.
+        """
+        cls.objects.bulk_create(
+            [
+                cls(
+                    user=user,
+                    plan=plan,
+                    end_date=timezone.now() + timedelta(days=plan.duration_days),
+                    razorpay_order_id=razorpay_order_id,
+                    razorpay_payment_id=razorpay_payment_id
+                )
+            ],
+            ignore_conflicts=True
+        )
+        invalidate_profile_cache(user.id)
+
     @property
     def is_active(self):
         """A property to check if the subscription is currently valid."""
+        # Use the value annotated by with_active() when present
+        if hasattr(self, '_is_active'):
+            return self._is_active
         return self.end_date > timezone.now()
     
     def __str__(self):
-        return f"{self.user.username}'s {self.plan.name} (Expires: {self.end_date.strftime('%Y-%m-%d')})"
\ No newline at end of file
+        return f"{self.user.username}'s {self.plan.name} (Expires: {self.end_date.strftime('%Y-%m-%d')})"
+
+
+class PendingOrder(models.Model):
+    """
+    A Razorpay order created by create_order, kept locally so payment
+    verification can find its user and plan without calling Razorpay.
+    """
+    order_id = models.CharField(primary_key=True, max_length=64)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="pending_orders"
+    )
+    plan = models.ForeignKey(
+        SubscriptionPlan,
+        on_delete=models.CASCADE,
+        related_name="pending_orders"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.order_id} ({self.user.username}, {self.plan.name})"
@@ -0,0 +1,13 @@
+# subscriptions/signals.py
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from .models import SubscriptionPlan
+from .utils import invalidate_plans_cache
+
+
+@receiver(post_save, sender=SubscriptionPlan)
+@receiver(post_delete, sender=SubscriptionPlan)
+def invalidate_cached_plans(sender, instance, **kwargs):
+    """Keeps the cached plan list in step with the admin's edits."""
+    invalidate_plans_cache()
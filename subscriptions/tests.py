@@ -1,3 +1,52 @@
+import hashlib
+import hmac
+import json
+
+from django.conf import settings
+from django.contrib.auth.models import User
 from django.test import TestCase
 
-# Create your tests here.
+from .models import PendingOrder, SubscriptionPlan, UserSubscription
+
+
+class RazorpayWebhookTests(TestCase):
+    url = '/api/subscriptions/webhook/razorpay/'
+
+    def setUp(self):
+        self.user = User.objects.create_user('student', password='pass')
+        self.plan = SubscriptionPlan.objects.create(name='Yearly', price='299.00', duration_days=365)
+        PendingOrder.objects.create(order_id='order_1', user=self.user, plan=self.plan)
+        self.body = json.dumps({
+            'event': 'payment.captured',
+            'payload': {'payment': {'entity': {
+                'id': 'pay_1',
+                'order_id': 'order_1',
+                'notes': {'user_id': self.user.id, 'plan_id': self.plan.id},
+            }}},
+        }).encode('utf-8')
+
+    def post_event(self, signature):
+        return self.client.post(
+            self.url, self.body, content_type='application/json',
+            HTTP_X_RAZORPAY_SIGNATURE=signature
+        )
+
+    def sign(self, body):
+        return hmac.new(
+            settings.RAZORPAY_WEBHOOK_SECRET.encode('utf-8'), body, hashlib.sha256
+        ).hexdigest()
+
+    def test_replayed_event_creates_one_subscription(self):
+        signature = self.sign(self.body)
+        self.assertEqual(self.post_event(signature).status_code, 200)
+        self.assertEqual(self.post_event(signature).status_code, 200)
+
+        subscriptions = UserSubscription.objects.filter(user=self.user)
+        self.assertEqual(subscriptions.count(), 1)
+        self.assertEqual(subscriptions.get().razorpay_order_id, 'order_1')
+
+    def test_bad_signature_is_rejected(self):
+        for signature in [self.sign(b'tampered'), 'not-hex', '']:
+            response = self.post_event(signature)
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(UserSubscription.objects.exists())
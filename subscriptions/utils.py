@@ -0,0 +1,11 @@
+# subscriptions/utils.py
+
+from django.core.cache import cache
+
+PLANS_CACHE_KEY = "sub_plans:v1"
+PLANS_CACHE_TIMEOUT = 3600  # seconds
+
+
+def invalidate_plans_cache():
+    """Drop the cached plan list after a plan is added, changed or removed."""
+    cache.delete(PLANS_CACHE_KEY)
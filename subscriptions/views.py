@@ -8,26 +8,60 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.http import HttpResponse
 from django.conf import settings
+from django.core.cache import cache
 from django.views.decorators.csrf import csrf_exempt
 from django.utils import timezone
 from django.contrib.auth.models import User
 import razorpay
+import requests
+from requests.adapters import HTTPAdapter
 import hmac
 import hashlib
 import json
 
-from .models import SubscriptionPlan, UserSubscription
+from .models import PendingOrder, SubscriptionPlan, UserSubscription
 from .serializers import SubscriptionPlanSerializer, UserSubscriptionSerializer
+from .utils import PLANS_CACHE_KEY, PLANS_CACHE_TIMEOUT
+
+# Every Razorpay API call is bounded, so a slow gateway cannot hold a worker forever
+RAZORPAY_TIMEOUT = 5  # seconds
 
 # Initialize Razorpay client
 try:
+    # One keep-alive connection pool per worker, shared by all its threads,
+    # so payment calls reuse the TLS connection instead of handshaking again
+    razorpay_session = requests.Session()
+    razorpay_session.mount('https://', HTTPAdapter(pool_maxsize=20))
     razorpay_client = razorpay.Client(
+        session=razorpay_session,
         auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
     )
 except Exception as e:
     print(f"Could not initialize Razorpay client: {e}")
     razorpay_client = None
 
+# Encoded once; every webhook is signed with it
+RAZORPAY_WEBHOOK_SECRET = settings.RAZORPAY_WEBHOOK_SECRET.encode('utf-8')
+
+
+def get_order_user_and_plan(order_id, notes=None):
+    """
+    The user and plan a Razorpay order was created for.
+    create_order records them as a PendingOrder, so this is normally a local
+    primary-key lookup. Orders without a local record fall back to the
+    order notes, fetched from Razorpay unless the caller already has them.
+    """
+    try:
+        order = PendingOrder.objects.select_related('user', 'plan').get(pk=order_id)
+        return order.user, order.plan
+    except PendingOrder.DoesNotExist:
+        if notes is None:
+            notes = razorpay_client.order.fetch(order_id, timeout=RAZORPAY_TIMEOUT)['notes']
+        user = User.objects.get(id=notes.get('user_id'))
+        plan = SubscriptionPlan.objects.get(id=notes.get('plan_id'))
+        return user, plan
+
+
 class SubscriptionViewSet(viewsets.ReadOnlyModelViewSet):
     """
     Handles listing plans and creating payment orders.
@@ -36,6 +70,14 @@ class SubscriptionViewSet(viewsets.ReadOnlyModelViewSet):
     serializer_class = SubscriptionPlanSerializer
     permission_classes = [IsAuthenticated] # Only logged-in users can see plans
 
+    def list(self, request, *args, **kwargs):
+        # Plans rarely change; the serialized list is cached until one is saved or deleted
+        data = cache.get(PLANS_CACHE_KEY)
+        if data is None:
+            data = self.get_serializer(self.get_queryset(), many=True).data
+            cache.set(PLANS_CACHE_KEY, data, timeout=PLANS_CACHE_TIMEOUT)
+        return Response(data)
+
     @action(detail=True, methods=['post'])
     def create_order(self, request, pk=None):
         """
@@ -55,13 +97,14 @@ class SubscriptionViewSet(viewsets.ReadOnlyModelViewSet):
         user = request.user
         
         # Prevent buying a new plan if one is already active
-        if user.profile.has_active_subscription:
+        # One EXISTS on the (user, end_date) index; the profile is not needed here
+        if UserSubscription.objects.filter(user_id=user.id).active().exists():
             return Response(
                 {'error': 'You already have an active subscription.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        amount_in_paise = int(plan.price * 100) # Razorpay requires amount in paise
+        amount_in_paise = plan.price_paise # Razorpay requires amount in paise
 
         try:
             order_data = {
@@ -74,7 +117,8 @@ class SubscriptionViewSet(viewsets.ReadOnlyModelViewSet):
                     "email": user.email
                 }
             }
-            order = razorpay_client.order.create(data=order_data)
+            order = razorpay_client.order.create(data=order_data, timeout=RAZORPAY_TIMEOUT)
+            PendingOrder.objects.create(order_id=order['id'], user=user, plan=plan)
             
             return Response({
                 "order_id": order['id'],
@@ -123,25 +167,11 @@ class SubscriptionViewSet(viewsets.ReadOnlyModelViewSet):
 
         # 2. GET USER/PLAN DETAILS from the Order (must be done AFTER verification)
         try:
-            order = razorpay_client.order.fetch(razorpay_order_id)
-            notes = order['notes']
-            user_id = notes.get('user_id')
-            plan_id = notes.get('plan_id')
-
-            user = User.objects.get(id=user_id)
-            plan = SubscriptionPlan.objects.get(id=plan_id)
+            user, plan = get_order_user_and_plan(razorpay_order_id)
             
             # 3. ACTIVATE THE SUBSCRIPTION
-            # Use get_or_create to prevent duplicates if the webhook fires later
-            UserSubscription.objects.get_or_create(
-                user=user,
-                plan=plan,
-                defaults={
-                    'razorpay_order_id': razorpay_order_id,
-                    'razorpay_payment_id': razorpay_payment_id,
-                    # start_date and end_date will be set by the model
-                }
-            )
+            # Idempotent on the order id, so a later webhook adds no duplicate
+            UserSubscription.activate(user, plan, razorpay_order_id, razorpay_payment_id)
             
             return Response({'message': 'Payment successfully verified and subscription activated.'}, status=status.HTTP_200_OK)
 
@@ -154,9 +184,13 @@ class SubscriptionViewSet(viewsets.ReadOnlyModelViewSet):
         """
         Get the user's current active subscription status.
         """
-        subscription = UserSubscription.objects.filter(
+        # Join the plan for the nested serializer and load only the columns it shows
+        subscription = UserSubscription.objects.with_active().filter(
             user=request.user,
             end_date__gt=timezone.now()
+        ).select_related('plan').only(
+            'id', 'user_id', 'start_date', 'end_date',
+            'plan__name', 'plan__price', 'plan__duration_days'
         ).order_by('-end_date').first()
         
         if subscription:
@@ -186,21 +220,26 @@ def razorpay_webhook(request):
     if request.method != "POST":
         return HttpResponse(status=405) # 405 Method Not Allowed
 
-    body = request.body.decode('utf-8')
-    received_signature = request.headers.get('X-Razorpay-Signature')
+    # The raw bytes are signed and parsed as they are, without decoding
+    body = request.body
+    received_signature = request.headers.get('X-Razorpay-Signature') or ''
 
     # 1. Verify the signature
     try:
-        secret = settings.RAZORPAY_WEBHOOK_SECRET
-        
         # 💡 CHANGE 2: Robust signature calculation and comparison
         calculated_signature = hmac.new(
-            secret.encode('utf-8'),
-            body.encode('utf-8'),
+            RAZORPAY_WEBHOOK_SECRET,
+            body,
             hashlib.sha256
-        ).hexdigest()
-        
-        if not hmac.compare_digest(calculated_signature, received_signature):
+        ).digest()
+
+        try:
+            received_digest = bytes.fromhex(received_signature)
+        except ValueError:
+            received_digest = b''
+
+        # Constant-time comparison of the raw digests
+        if not hmac.compare_digest(calculated_signature, received_digest):
             print("WEBHOOK SIGNATURE MISMATCH")
             # 💡 CHANGE 3: Use HttpResponse and integer status code
             return HttpResponse('Invalid signature', status=400) 
@@ -233,19 +272,10 @@ def razorpay_webhook(request):
                 return HttpResponse('Missing notes data', status=400)
 
             # 3. ACTIVATE THE SUBSCRIPTION
-            user = User.objects.get(id=user_id)
-            plan = SubscriptionPlan.objects.get(id=plan_id)
+            user, plan = get_order_user_and_plan(razorpay_order_id, notes)
             
-            # 💡 CHANGE 6: Use get_or_create for idempotency (prevents duplicates on retries)
-            UserSubscription.objects.get_or_create(
-                user=user,
-                plan=plan,
-                # Use a field that can be constrained to prevent duplicate records (e.g., order ID)
-                defaults={
-                    'razorpay_order_id': razorpay_order_id,
-                    'razorpay_payment_id': razorpay_payment_id,
-                }
-            )
+            # 💡 CHANGE 6: Idempotent on the unique order id (no duplicates on retries)
+            UserSubscription.activate(user, plan, razorpay_order_id, razorpay_payment_id)
             
             print(f"SUCCESS: Subscription activated for user {user.id} with plan {plan.id}")
             
@@ -285,28 +315,15 @@ def payment_callback(request):
         
         # 1. Fetch Payment Status
         try:
-            payment_info = razorpay_client.payment.fetch(razorpay_payment_id)
+            payment_info = razorpay_client.payment.fetch(razorpay_payment_id, timeout=RAZORPAY_TIMEOUT)
             status_info = payment_info.get('status')
             
             if status_info == 'captured':
                 # 2. Get User/Plan details (from the order notes)
-                order = razorpay_client.order.fetch(razorpay_order_id)
-                notes = order['notes']
-                user_id = notes.get('user_id')
-                plan_id = notes.get('plan_id')
-                
-                user = User.objects.get(id=user_id)
-                plan = SubscriptionPlan.objects.get(id=plan_id)
+                user, plan = get_order_user_and_plan(razorpay_order_id)
                 
                 # 3. ACTIVATE THE SUBSCRIPTION (Same logic as verify_payment)
-                UserSubscription.objects.get_or_create(
-                    user=user,
-                    plan=plan,
-                    defaults={
-                        'razorpay_order_id': razorpay_order_id,
-                        'razorpay_payment_id': razorpay_payment_id,
-                    }
-                )
+                UserSubscription.activate(user, plan, razorpay_order_id, razorpay_payment_id)
 
                 # 4. FINAL REDIRECT TO FRONTEND DASHBOARD
                 # 💡 Add a query param so the frontend can display a success toast